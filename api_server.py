@@ -0,0 +1,360 @@
+import asyncio
+import contextlib
+import contextvars
+import inspect
+import io
+import json
+import os
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import data_management
+import services
+from config import API_FLUSH_INTERVAL, API_HOST, API_PORT, API_SOCKET
+from error_management.exceptions import (
+    AppError,
+    InputError,
+    PasswordAuthenticationError,
+    SessionError,
+    TaskNotFoundError,
+)
+from logging_utils import get_logger
+from models import Task
+from session_management import (
+    Session,
+    current_session,
+    get_session_user,
+    verify_session_expired,
+)
+from utils import (
+    hash_word_async,
+    is_valid_description,
+    is_valid_name,
+    is_valid_pass,
+    is_valid_task_status,
+    is_valid_title,
+    verify_hashed_word_async,
+    verify_uuid,
+    word_needs_rehash,
+)
+
+logger = get_logger(__name__)
+state = data_management.get_persistent_data()
+
+
+def validate(is_valid: bool, message: str) -> None:
+    """Raises an InputError with the message if is_valid is False."""
+    if not is_valid:
+        raise InputError(message)
+
+
+def get_own_task(task_uuid: str) -> Task:
+    """Returns the not deleted Task of the session user with the UUID."""
+    task = state["taskset"].get_task_by_uuid(task_uuid)
+    if (
+        task is None
+        or task.get_value("deleted")
+        or task.get_value("owner_uuid") != get_session_user().get_user_uuid()
+    ):
+        raise TaskNotFoundError(f"The task {task_uuid} doesn't exist.")
+    return task
+
+
+class APIServer:
+    """
+    asyncio server of the services as JSON lines request and responses:
+        request:  {"id": 1, "method": "create_task",
+                   "params": {"title": ..., "description": ...}}
+        response: {"id": 1, "result": ..., "output": "printed text"}
+                  {"id": 1, "error": "SessionError", "message": ...}
+    Each connection has its own session. The services run one at a time
+    in the state thread, while argon2 runs in the hashing pool, and the
+    changes are stored every flush_interval seconds.
+    """
+
+    def __init__(self, flush_interval: float):
+        self.flush_interval = flush_interval
+        # Every access to the state runs in this thread, one at a time.
+        self.state_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="state"
+        )
+        self.methods: Dict[str, Callable[..., Any]] = {
+            "create_new_user": self.create_new_user,
+            "login": self.login,
+            "logout": self.logout,
+            "create_task": self.create_task,
+            "edit_task": self.edit_task,
+            "delete_task": self.delete_task,
+            "list_user_tasks": self.list_user_tasks,
+        }
+
+    async def run_in_state(
+        self,
+        session: Session,
+        function: Callable[..., Any],
+        *args: Any,
+        needs_session: bool = False,
+    ) -> Tuple[Any, str]:
+        """
+        Runs the function in the state thread with the session of the \
+        connection, returns its result and its printed output.
+        """
+
+        def call() -> Tuple[Any, str]:
+            current_session.set(session)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                if needs_session and verify_session_expired():
+                    raise SessionError("There's no session, login first.")
+                result = function(*args)
+            return result, output.getvalue()
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.state_executor, contextvars.copy_context().run, call
+        )
+
+    async def create_new_user(
+        self, session: Session, name: str, password: str
+    ) -> Tuple[Any, str]:
+        validate(is_valid_name(name), "The name is not valid.")
+        validate(is_valid_pass(password), "The password is not valid.")
+        # Hashed in the hashing pool, the state thread only stores it.
+        hashed_password = await asyncio.wrap_future(hash_word_async(password))
+        if not hashed_password:
+            raise PasswordAuthenticationError("The password wasn't hashed.")
+        logged_in, output = await self.run_in_state(
+            session,
+            services.create_new_user,
+            name,
+            password,
+            hashed_password,
+        )
+        return {"logged_in": logged_in}, output
+
+    async def login(
+        self, session: Session, name: str, password: str
+    ) -> Tuple[Any, str]:
+        validate(is_valid_name(name), "The name is not valid.")
+        validate(is_valid_pass(password), "The password is not valid.")
+
+        def get_stored_password() -> Optional[Tuple[str, str]]:
+            user = state["userset"].get_user_by_name(name)
+            if user is None:
+                return None
+            return user.get_user_uuid(), user.get_data()["password"]
+
+        stored, _ = await self.run_in_state(session, get_stored_password)
+        # Without a user, a login racing its creation isn't verified.
+        verification: Tuple[str, bool] = ("", False)
+        rehashed_password = None
+        if stored is not None:
+            # Verified and rehashed in the hashing pool, the state thread
+            # only checks the stored hash is still the verified one.
+            user_uuid, stored_password = stored
+            is_correct = await asyncio.wrap_future(
+                verify_hashed_word_async(password, stored_password, user_uuid)
+            )
+            verification = (stored_password, bool(is_correct))
+            if is_correct and word_needs_rehash(stored_password):
+                rehashed_password = await asyncio.wrap_future(
+                    hash_word_async(password)
+                )
+        logged_in, output = await self.run_in_state(
+            session,
+            services.login,
+            name,
+            password,
+            verification,
+            rehashed_password or None,
+        )
+        return {"logged_in": logged_in}, output
+
+    async def logout(self, session: Session) -> Tuple[Any, str]:
+        return await self.run_in_state(session, services.logout)
+
+    async def create_task(
+        self, session: Session, title: str, description: str
+    ) -> Tuple[Any, str]:
+        validate(is_valid_title(title), "The title is not valid.")
+        validate(
+            is_valid_description(description), "The description is not valid."
+        )
+        task, output = await self.run_in_state(
+            session,
+            services.create_task,
+            title,
+            description,
+            needs_session=True,
+        )
+        return task.get_data(), output
+
+    async def edit_task(
+        self,
+        session: Session,
+        uuid: str,
+        title: str,
+        description: str,
+        status: str,
+    ) -> Tuple[Any, str]:
+        validate(verify_uuid(uuid), "The task UUID is not valid.")
+        validate(is_valid_title(title), "The title is not valid.")
+        validate(
+            is_valid_description(description), "The description is not valid."
+        )
+        validate(
+            is_valid_task_status(status), "The status should be t, p or d."
+        )
+
+        def edit() -> Dict:
+            get_own_task(uuid)
+            services.edit_task(uuid, title, description, status)
+            return get_own_task(uuid).get_data()
+
+        return await self.run_in_state(session, edit, needs_session=True)
+
+    async def delete_task(
+        self, session: Session, uuid: str
+    ) -> Tuple[Any, str]:
+        validate(verify_uuid(uuid), "The task UUID is not valid.")
+
+        def delete() -> None:
+            get_own_task(uuid)
+            services.delete_task(uuid)
+
+        return await self.run_in_state(session, delete, needs_session=True)
+
+    async def list_user_tasks(self, session: Session) -> Tuple[Any, str]:
+        def list_tasks() -> List[Dict]:
+            # The printed tasks are returned as data instead.
+            with contextlib.redirect_stdout(io.StringIO()):
+                tasks = services.list_user_tasks()
+            return sorted(
+                (task.get_data() for task in tasks),
+                key=lambda data: data["creation_datetime"],
+            )
+
+        return await self.run_in_state(session, list_tasks, needs_session=True)
+
+    async def handle_request(self, session: Session, line: bytes) -> Dict:
+        """Runs the method of the request and returns the response."""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise InputError("The request should be a JSON object.")
+            request_id = request.get("id")
+            method_name = request.get("method")
+            method = (
+                self.methods.get(method_name)
+                if isinstance(method_name, str)
+                else None
+            )
+            if method is None:
+                raise InputError(f"The method '{method_name}' is not defined.")
+            params = request.get("params") or {}
+            if not isinstance(params, dict):
+                raise InputError("The params should be a JSON object.")
+            # Bound first, a TypeError of the method itself is not an input.
+            try:
+                inspect.signature(method).bind(session, **params)
+            except TypeError as te:
+                raise InputError(f"The params are not valid: {te}")
+            result, output = await method(session, **params)
+            return {"id": request_id, "result": result, "output": output}
+        except json.JSONDecodeError as jse:
+            return {"id": None, "error": "InputError", "message": str(jse)}
+        except AppError as ae:
+            return {
+                "id": request_id,
+                "error": type(ae).__name__,
+                "message": ae.message,
+            }
+        except Exception as e:
+            logger.error(f"APIServer.handle_request: Error: {e}")
+            return {
+                "id": request_id,
+                "error": "AppError",
+                "message": "The request failed.",
+            }
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answers the requests of a connection in order, with its session."""
+        session = Session()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.handle_request(session, line)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except ValueError as ve:
+            # The request line is longer than the stream limit.
+            logger.warning(f"APIServer.handle_connection: {ve}")
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def flush(self) -> None:
+        """Stores the changed sets from the state thread."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.state_executor, flush_changes)
+
+    async def flush_periodically(self) -> None:
+        """Stores the changes every flush_interval seconds."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def serve(self) -> None:
+        """Serves on API_SOCKET, or on API_HOST:API_PORT, until cancelled."""
+        if API_SOCKET:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, path=API_SOCKET
+            )
+            os.chmod(API_SOCKET, 0o600)
+            address = API_SOCKET
+        else:
+            server = await asyncio.start_server(
+                self.handle_connection, API_HOST, API_PORT
+            )
+            address = f"{API_HOST}:{API_PORT}"
+        logger.info(f"API listening at {address}.")
+        print(f"API listening at {address}.")
+        flushing = asyncio.create_task(self.flush_periodically())
+        serving = asyncio.current_task()
+        if serving is not None:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, serving.cancel
+            )
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            flushing.cancel()
+            await self.flush()
+            self.state_executor.shutdown()
+            if API_SOCKET:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(API_SOCKET)
+
+
+def flush_changes() -> List[str]:
+    """Stores the sets if any of them changed."""
+    if not data_management.has_unsaved_changes():
+        return []
+    return data_management.data_saving()
+
+
+def run_api_server() -> None:
+    """Serves the API until it's interrupted."""
+    with contextlib.suppress(KeyboardInterrupt, asyncio.CancelledError):
+        asyncio.run(APIServer(API_FLUSH_INTERVAL).serve())
+    logger.info("API stopped.")
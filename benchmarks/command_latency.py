@@ -0,0 +1,105 @@
+"""
+Compares the argument parsing latency of each CLI command: building the
+whole parser tree every time, the two-phase parse with only the parser
+of the subcommand and the same parse with the cached parsers, as the
+daemon runs them. The data validators run in the three of them, with the
+data already loaded from a copy of the data folder with the benchmark user
+and task. Run it from the repository root:
+python -m benchmarks.command_latency
+"""
+
+import argparse
+import os
+import tempfile
+from typing import Callable, List
+
+from benchmarks.startup_time import (
+    TASK_UUID,
+    USER_NAME,
+    USER_PASSWORD,
+    create_benchmark_data,
+)
+
+COMMANDS = {
+    "tasks list": ["tasks", "list"],
+    "tasks add": ["tasks", "add", "-t", "Title", "-d", "Description"],
+    "tasks del": ["tasks", "del", "-id", TASK_UUID],
+    "users create": ["users", "create", "-n", "benchuser", "-p", "bench1234"],
+    "users login": ["users", "login", "-n", USER_NAME, "-p", USER_PASSWORD],
+}
+
+
+def get_approaches() -> List[Callable[[List[str]], None]]:
+    """
+    Returns the parsing approaches, the parsers are imported here, once \
+    FILEPATH has the data copy.
+    """
+    from frontend.arg_interface import (
+        create_paser,
+        get_command_parser,
+        validate_command_data,
+    )
+
+    def parse_with_whole_parser(argv: List[str]) -> None:
+        """Builds the whole parser tree, like every command did before."""
+        args = create_paser.__wrapped__().parse_args(argv)
+        validate_command_data(args)
+
+    def parse_in_two_phases(argv: List[str]) -> None:
+        """Builds only the parser of the subcommand."""
+        create_paser.cache_clear()
+        args = get_command_parser(argv).parse_args(argv)
+        validate_command_data(args)
+
+    def parse_with_cached_parser(argv: List[str]) -> None:
+        """Reuses the parser of the subcommand built before."""
+        args = get_command_parser(argv).parse_args(argv)
+        validate_command_data(args)
+
+    return [
+        parse_with_whole_parser,
+        parse_in_two_phases,
+        parse_with_cached_parser,
+    ]
+
+
+def main() -> None:
+    """Prints the parsing time of every command with each approach."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--number", type=int, default=200)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        data_path, task_uuid = create_benchmark_data(directory)
+        os.environ.update(FILEPATH=data_path, ENVIRONMENT="Production")
+        # The modules read the configuration once they're imported.
+        from benchmarks.snapshot_formats import best_time
+        from data_management import data_loading
+        from session_management import load_session
+
+        data_loading()
+        load_session()
+        approaches = get_approaches()
+        print(f"{'command':>12}: {'whole':>9} {'two-phase':>9} {'cached':>9}")
+        for command, argv in COMMANDS.items():
+            argv = [argument.format(task_uuid=task_uuid) for argument in argv]
+            # Loads the sets the validators read before timing.
+            approaches[0](argv)
+            times = []
+            for approach in approaches:
+
+                def run_number() -> None:
+                    for _ in range(arguments.number):
+                        approach(argv)
+
+                best = best_time(run_number, arguments.repeat)
+                times.append(best / arguments.number * 1_000_000)
+            print(
+                f"{command:>12}: "
+                + " ".join(f"{value:6.0f} µs" for value in times)
+            )
+
+
+if __name__ == "__main__":
+    main()
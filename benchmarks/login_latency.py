@@ -0,0 +1,50 @@
+"""
+Reports the login latency of each argon2 cost profile: the password
+verification plus the rehash check done by services.login.
+Run it from the repository root: python -m benchmarks.login_latency
+"""
+
+import argparse
+import statistics
+import time
+
+from constants import ARGON2_PROFILES
+from utils import create_hasher
+
+
+def main() -> None:
+    """Prints the hash and login times of every profile."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--repeat", type=int, default=10)
+    parser.add_argument(
+        "-p",
+        "--profiles",
+        nargs="+",
+        default=list(ARGON2_PROFILES),
+        choices=list(ARGON2_PROFILES),
+    )
+    arguments = parser.parse_args()
+
+    password = "password123"
+    for profile in arguments.profiles:
+        hasher = create_hasher(profile)
+        hash_times = []
+        login_times = []
+        for _ in range(arguments.repeat):
+            start = time.perf_counter()
+            stored_hash = hasher.hash(password)
+            hash_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            hasher.verify(stored_hash, password)
+            hasher.check_needs_rehash(stored_hash)
+            login_times.append(time.perf_counter() - start)
+        print(
+            f"{profile:>9}: hash {statistics.median(hash_times) * 1000:8.1f} "
+            f"ms, login median {statistics.median(login_times) * 1000:8.1f} "
+            f"ms, max {max(login_times) * 1000:8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
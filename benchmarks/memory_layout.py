@@ -0,0 +1,91 @@
+"""
+Compares the memory used by Task objects with the __slots__ layout against
+the previous __dict__ layout, alone and stored in a populated TaskSet.
+Run it from the repository root: python -m benchmarks.memory_layout
+"""
+
+import argparse
+import gc
+import tracemalloc
+import uuid
+from typing import Any, Callable, List
+
+from models import Task, TaskSet
+
+
+# Same constructor as Task, but the attributes live in a __dict__.
+DictTask = type("DictTask", (), {"__init__": Task.__init__})
+
+
+def create_tasks(task_class: Callable, count: int, owners: int) -> List:
+    """Returns count tasks of the received class spread over the owners."""
+    owner_uuids = [str(uuid.uuid4()) for _ in range(owners)]
+    return [
+        task_class(
+            f"Title {index}",
+            f"Description {index}",
+            owner_uuids[index % owners],
+            task_uuid=str(uuid.uuid4()),
+            creation_datetime="2025/09/13, 22:39:11",
+            update_datetime="2025/09/13, 22:39:11",
+        )
+        for index in range(count)
+    ]
+
+
+def create_task_set(count: int, owners: int) -> TaskSet:
+    """Returns a stored TaskSet with count tasks, as it is after loading."""
+    task_set = TaskSet()
+    for task in create_tasks(Task, count, owners):
+        task_set.add(task)
+    task_set.mark_clean()
+    return task_set
+
+
+def measure(build: Callable[[], Any]) -> int:
+    """Returns the bytes still allocated by what build returns."""
+    gc.collect()
+    tracemalloc.start()
+    built = build()
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del built
+    return allocated
+
+
+def main() -> None:
+    """Prints the memory used by each layout."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-c", "--count", type=int, default=1_000_000)
+    parser.add_argument("-o", "--owners", type=int, default=1000)
+    arguments = parser.parse_args()
+    count, owners = arguments.count, arguments.owners
+
+    results = {
+        "__dict__": measure(lambda: create_tasks(DictTask, count, owners)),
+        "__slots__": measure(lambda: create_tasks(Task, count, owners)),
+        "in set": measure(lambda: create_task_set(count, owners)),
+    }
+    for layout, allocated in results.items():
+        print(
+            f"{layout:>10}: {allocated / 2**20:8.1f} MiB "
+            f"({allocated / count:6.1f} bytes per task)"
+        )
+    # The back-references and the index buckets of each stored task, a
+    # DictTask can't be stored so it's taken as the same for both layouts.
+    overhead = results["in set"] - results["__slots__"]
+    stored_dict = results["__dict__"] + overhead
+    saved = results["__dict__"] - results["__slots__"]
+    print(
+        f"{'overhead':>10}: {overhead / 2**20:8.1f} MiB "
+        f"({overhead / count:6.1f} bytes per task in the set)"
+    )
+    print(
+        f"{'saved':>10}: {saved / 2**20:8.1f} MiB "
+        f"({saved / stored_dict:6.1%} of the stored __dict__ tasks)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares the serial load of a tasks file with the parallel decoding in a
+process and a thread pool. Run it from the repository root:
+python -m benchmarks.parallel_loading
+"""
+
+import argparse
+import json
+import os
+import tempfile
+
+from benchmarks.snapshot_formats import best_time, generate_tasks
+from constants import PARALLEL_LOAD_CHUNK_SIZE
+from models import TaskSet
+from parallel_loading import create_executor, submit_json_decoding
+
+
+def main() -> None:
+    """Prints the load time of the tasks file with each pool and workers."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-c", "--count", type=int, default=200_000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[2, 4, os.cpu_count() or 1],
+    )
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.JSON")
+        with open(path, "w") as file:
+            json.dump(generate_tasks(arguments.count), file, indent=4)
+        size = os.path.getsize(path)
+        print(
+            f"{arguments.count} tasks, {size / 2**20:.1f} MiB, "
+            f"{os.cpu_count()} CPUs"
+        )
+
+        def load_serial() -> None:
+            with open(path, "r") as file:
+                TaskSet(json.load(file))
+
+        serial = best_time(load_serial, arguments.repeat)
+        print(f"{'serial':>7}: decode + set {serial * 1000:8.1f} ms")
+        for kind in ("process", "thread"):
+            for workers in sorted(set(arguments.workers)):
+                with create_executor(workers, kind) as executor:
+                    # Starts the workers before timing.
+                    submit_json_decoding(executor, path, workers, size)()
+
+                    def load_parallel() -> None:
+                        TaskSet(
+                            submit_json_decoding(
+                                executor,
+                                path,
+                                workers,
+                                PARALLEL_LOAD_CHUNK_SIZE,
+                            )()
+                        )
+
+                    parallel = best_time(load_parallel, arguments.repeat)
+                print(
+                    f"{kind:>7}: decode + set {parallel * 1000:8.1f} ms "
+                    f"with {workers} workers ({serial / parallel:.2f}x)"
+                )
+
+
+if __name__ == "__main__":
+    main()
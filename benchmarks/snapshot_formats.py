@@ -0,0 +1,74 @@
+"""
+Compares the save and load times of the JSON and binary snapshot formats.
+Run it from the repository root: python -m benchmarks.snapshot_formats
+"""
+
+import argparse
+import io
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+from models import Task
+from serializers import SERIALIZERS
+
+
+def generate_tasks(count: int) -> List[Dict]:
+    """Returns the dump of count tasks spread over a hundred users."""
+    owners = [str(uuid.uuid4()) for _ in range(100)]
+    return [
+        Task(
+            f"Title {index}",
+            f"Description of the task {index}",
+            owners[index % len(owners)],
+            deleted=index % 10 == 0,
+        ).get_data()
+        for index in range(count)
+    ]
+
+
+def best_time(function: Callable[[], object], repeat: int) -> float:
+    """Returns the best time in seconds of repeat calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    """Prints the save and load time and the size of each format."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-c", "--count", type=int, default=100_000)
+    parser.add_argument("-r", "--repeat", type=int, default=3)
+    arguments = parser.parse_args()
+
+    records = generate_tasks(arguments.count)
+    names = [name[1:] for name in Task.get_attribute_names()]
+    for name, serializer in SERIALIZERS.items():
+        # A bytes or a text file, as the serializer writes one or the other.
+        new_file: Callable[..., Any] = (
+            io.BytesIO if serializer.binary else io.StringIO
+        )
+        file = new_file()
+        serializer.dump(records, names, file)
+        content = file.getvalue()
+
+        save = best_time(
+            lambda: serializer.dump(records, names, new_file()),
+            arguments.repeat,
+        )
+        load = best_time(
+            lambda: serializer.load(new_file(content)), arguments.repeat
+        )
+        assert serializer.load(new_file(content)) == records
+        size = len(content) if serializer.binary else len(content.encode())
+        print(
+            f"{name:>7}: save {save * 1000:8.1f} ms, "
+            f"load {load * 1000:8.1f} ms, size {size / 2**20:6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Reports the import time of CLI commands with python -X importtime,
+without the interpreter startup, and fails if one is over the threshold
+or imports a module it shouldn't, like argon2 for the commands that
+don't hash a password. It runs on a copy of the data folder, with a
+user and a task created for it.
+Run it from the repository root: python -m benchmarks.startup_time
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import AbstractSet, Dict, List, Set, Tuple
+
+# Login of the user created for the benchmarks.
+USER_NAME = "benchmark"
+USER_PASSWORD = "benchmark123"
+# Placeholder of the UUID of the task created for the benchmarks.
+TASK_UUID = "{task_uuid}"
+# Creates the user, logged in, and its task, and prints the task UUID.
+SETUP_SCRIPT = f"""
+import contextlib
+import io
+
+import data_management
+import services
+
+data_management.data_loading()
+with contextlib.redirect_stdout(io.StringIO()):
+    services.create_new_user({USER_NAME!r}, {USER_PASSWORD!r})
+    task = services.create_task("Benchmark", "Benchmark task")
+data_management.data_saving()
+print(task.get_value("task_uuid"))
+"""
+
+# Commands with the modules they must not import.
+COMMANDS: Dict[str, Tuple[List[str], Set[str]]] = {
+    "tasks list": (["tasks", "list"], {"argon2", "asyncio"}),
+    "tasks del": (["tasks", "del", "-id", TASK_UUID], {"argon2", "asyncio"}),
+    "users logout": (["users", "logout"], {"argon2", "asyncio"}),
+    "users login": (
+        ["users", "login", "-n", USER_NAME, "-p", USER_PASSWORD],
+        {"asyncio"},
+    ),
+}
+
+
+def create_benchmark_data(directory: str) -> Tuple[str, str]:
+    """
+    Copies the data folder into the directory and creates the benchmark \
+    user and its task there. Returns the data path and the task UUID.
+    """
+    data_path = os.path.join(directory, "data") + os.sep
+    shutil.copytree("data", data_path)
+    process = subprocess.run(
+        [sys.executable, "-c", SETUP_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, FILEPATH=data_path, ENVIRONMENT="Production"),
+    )
+    return data_path, process.stdout.split()[-1]
+
+
+def measure_imports(
+    arguments: List[str],
+    environment: Dict[str, str],
+    skipped: AbstractSet[str] = frozenset(),
+) -> Tuple[float, Set[str]]:
+    """
+    Runs python with the arguments under -X importtime and returns the \
+    import time in milliseconds of the top level modules not skipped, \
+    and the imported modules.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        input="n\n",
+        capture_output=True,
+        text=True,
+        env=environment,
+    )
+    total = 0
+    modules = set()
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.partition(":")[2].split("|")
+        modules.add(name.strip())
+        if not name[1:].startswith(" ") and name.strip() not in skipped:
+            # Top level imports, their cumulative time has the nested ones.
+            total += int(cumulative)
+    return total / 1000, modules
+
+
+def main() -> None:
+    """Prints the import time of each command and checks the threshold."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=100.0,
+        help="Maximum median import time of a command in milliseconds",
+    )
+    parser.add_argument(
+        "-c",
+        "--commands",
+        nargs="+",
+        default=list(COMMANDS),
+        choices=list(COMMANDS),
+    )
+    arguments = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        data_path, task_uuid = create_benchmark_data(directory)
+        environment = dict(
+            os.environ, FILEPATH=data_path, ENVIRONMENT="Production"
+        )
+        # The imports are measured with the bytecode, not compiling them.
+        environment.pop("PYTHONDONTWRITEBYTECODE", None)
+        subprocess.run(
+            [sys.executable, "-m", "compileall", "-q", "."],
+            check=True,
+            env=environment,
+        )
+        # The modules of the interpreter startup, like site, aren't counted.
+        _, interpreter_modules = measure_imports(["-c", "pass"], environment)
+        for command in arguments.commands:
+            argv, forbidden = COMMANDS[command]
+            argv = [argument.format(task_uuid=task_uuid) for argument in argv]
+            times = []
+            for _ in range(arguments.repeat):
+                import_time, modules = measure_imports(
+                    ["main.py", *argv], environment, interpreter_modules
+                )
+                times.append(import_time)
+            median = statistics.median(times)
+            imported = sorted(forbidden & modules)
+            print(
+                f"{command:>12}: imports median {median:6.1f} ms, "
+                f"min {min(times):6.1f} ms"
+                + (f", imports {', '.join(imported)}" if imported else "")
+            )
+            if median > arguments.threshold:
+                failures.append(
+                    f"'{command}' takes {median:.1f} ms to import, the "
+                    f"threshold is {arguments.threshold:.1f} ms."
+                )
+            if imported:
+                failures.append(f"'{command}' imports {', '.join(imported)}.")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import calendar
+import time
+from array import array
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, cast
+
+from constants import DATETIME_FORMAT
+from error_management.exception_utils import data_object_exception_manager
+from error_management.exceptions import TaskSetError
+from models import DataEntity, Task, TaskSet
+
+
+# Cached, a new task has the same creation and update text.
+@lru_cache(maxsize=4096)
+def datetime_to_timestamp(datetime_text: Optional[str]) -> int:
+    """Returns the UTC epoch seconds of a DATETIME_FORMAT text, 0 for None."""
+    if datetime_text is None:
+        return 0
+    return calendar.timegm(time.strptime(datetime_text, DATETIME_FORMAT))
+
+
+class InternedColumn:
+    """
+    Column of repeated strings, it stores one small integer code per row
+    and each distinct string only once.
+    """
+
+    def __init__(self) -> None:
+        self.codes = array("I")
+        self.values: List[Any] = []
+        self._codes_by_value: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        """Returns the code of the value, registering it if it's new."""
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            self._codes_by_value[value] = code
+            self.values.append(value)
+        return code
+
+    def find_code(self, value: Any) -> Optional[int]:
+        """Returns the code of the value, None if no row ever had it."""
+        return self._codes_by_value.get(value)
+
+    def append(self, value: Any) -> None:
+        self.codes.append(self.encode(value))
+
+    def set(self, row: int, value: Any) -> None:
+        self.codes[row] = self.encode(value)
+
+    def get(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+
+class TaskColumns:
+    """
+    Column store of the Task data, one contiguous column per attribute.
+    Status and owner are interned, deleted is a byte and the datetimes
+    are integer timestamps.
+    """
+
+    interned_keys = ("status", "owner_uuid")
+    timestamp_keys = ("creation_datetime", "update_datetime")
+    text_keys = ("task_uuid", "title", "description")
+
+    def __init__(self) -> None:
+        self.tasks: List[Task] = []
+        self.rows: Dict[Task, int] = {}
+        self.interned = {key: InternedColumn() for key in self.interned_keys}
+        self.timestamps = {key: array("q") for key in self.timestamp_keys}
+        self.texts: Dict[str, List[str]] = {key: [] for key in self.text_keys}
+        self.deleted = array("b")
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def append(self, task: Task) -> None:
+        """Adds a row with the data of the Task."""
+        self.rows[task] = len(self.tasks)
+        self.tasks.append(task)
+        for key, column in self.interned.items():
+            column.append(task.get_value(key))
+        for key, timestamps in self.timestamps.items():
+            timestamps.append(datetime_to_timestamp(task.get_value(key)))
+        for key, texts in self.texts.items():
+            texts.append(task.get_value(key))
+        self.deleted.append(bool(task.get_value("deleted")))
+
+    def set_values(self, task: Task, keys: Iterable[str]) -> None:
+        """Copies the current values of the keys from the Task to its row."""
+        row = self.rows[task]
+        for key in keys:
+            value = task.get_value(key)
+            if key in self.interned:
+                self.interned[key].set(row, value)
+            elif key in self.timestamps:
+                self.timestamps[key][row] = datetime_to_timestamp(value)
+            elif key in self.texts:
+                self.texts[key][row] = value
+            elif key == "deleted":
+                self.deleted[row] = bool(value)
+
+    def get_column(self, key: str) -> Any:
+        """Returns the column that keeps the ordering of the key values."""
+        if key in self.interned:
+            column = self.interned[key]
+            return [column.values[code] for code in column.codes]
+        if key in self.timestamps:
+            return self.timestamps[key]
+        if key in self.texts:
+            return self.texts[key]
+        if key == "deleted":
+            return self.deleted
+        raise KeyError(key)
+
+
+class ColumnarTaskSet(TaskSet):
+    """
+    TaskSet that mirrors its Tasks into a TaskColumns store, used for
+    the max operations that run over whole columns.
+    """
+
+    def __init__(self, json_list: Optional[List] = None):
+        self.columns = TaskColumns()
+        super().__init__(json_list)
+
+    @data_object_exception_manager
+    def index_data_entity(self, data_entity: DataEntity) -> None:
+        super().index_data_entity(data_entity)
+        self.columns.append(cast(Task, data_entity))
+
+    @data_object_exception_manager
+    def reindex(self, data_entity: DataEntity, previous_values: Dict) -> None:
+        super().reindex(data_entity, previous_values)
+        self.columns.set_values(
+            cast(Task, data_entity), previous_values.keys()
+        )
+
+    def max_task(self, key: str) -> Optional[Task]:
+        """
+        Returns the Task with the greatest value of the key, the last
+        added one between ties.
+        """
+        try:
+            column = self.columns.get_column(key)
+            if not column:
+                return None
+            get_value: Callable = column.__getitem__
+            row = max(range(len(column) - 1, -1, -1), key=get_value)
+            return self.columns.tasks[row]
+        except Exception as e:
+            raise TaskSetError(f"ColumnarTaskSet: in max_task: {e}")
+
+    def get_last_user_created_task(self) -> Task:
+        """Returns the most recently created Task."""
+        try:
+            task = self.max_task("creation_datetime")
+        except Exception as e:
+            raise TaskSetError(f"TaskSet: in getLastUserCreatedTask: {e}")
+        if task is None:
+            raise TaskSetError("There are no tasks.")
+        return task
@@ -3,3 +3,50 @@ import os
 
 ENVIRONMENT = os.getenv("ENVIRONMENT", "Development")
 FILEPATH = os.getenv("FILEPATH", "data/")
+# "set" keeps the tasks as objects, "columnar" also keeps them in columns.
+TASK_STORE = os.getenv("TASK_STORE", "set")
+# Appends each change to a journal instead of rewriting the whole files.
+JOURNAL_ENABLED = os.getenv("JOURNAL_ENABLED", "false").lower() == "true"
+# Amount of journal records that starts a compaction into a new snapshot.
+JOURNAL_COMPACTION_SIZE = int(os.getenv("JOURNAL_COMPACTION_SIZE", "1000"))
+# Writes the files into a temporary file that replaces them once complete.
+ATOMIC_WRITES = os.getenv("ATOMIC_WRITES", "true").lower() == "true"
+# Also syncs the folder after replacing a file, slower but crash durable.
+FSYNC_DIRECTORY = os.getenv("FSYNC_DIRECTORY", "false").lower() == "true"
+# Decodes the data files one item at a time instead of the whole file.
+STREAMING_LOAD = os.getenv("STREAMING_LOAD", "false").lower() == "true"
+# Format of the data snapshots: "json" or "binary".
+SNAPSHOT_FORMAT = os.getenv("SNAPSHOT_FORMAT", "json")
+# Also stores the tasks in a fixed width file read with mmap by "list".
+MMAP_TASK_VIEW = os.getenv("MMAP_TASK_VIEW", "false").lower() == "true"
+# Storage of the sets: "json" files or a local "sqlite" database.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json")
+# Stores the tasks in one file per owner_uuid prefix instead of one file.
+TASK_SHARDS = os.getenv("TASK_SHARDS", "false").lower() == "true"
+# Characters of the owner_uuid prefix, 2 hexadecimal gives 256 shards.
+TASK_SHARD_PREFIX_LENGTH = int(os.getenv("TASK_SHARD_PREFIX_LENGTH", "2"))
+# Workers that decode the data files in parallel, 0 loads them serially.
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", "0"))
+# Pool of the parallel loading: "process" or "thread".
+LOAD_EXECUTOR = os.getenv("LOAD_EXECUTOR", "process")
+# Argon2 cost profile of the password hashes: "fast-test", "balanced" or
+# "hardened". The older hashes are rehashed with it on login.
+ARGON2_PROFILE = os.getenv("ARGON2_PROFILE", "balanced")
+# Overrides of the profile costs, 0 keeps the profile value.
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "0"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "0"))  # in KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "0"))
+# Successful password verifications kept by the process, 0 disables them.
+VERIFICATION_CACHE_SIZE = int(os.getenv("VERIFICATION_CACHE_SIZE", "128"))
+# Seconds a cached password verification is valid.
+VERIFICATION_CACHE_TTL = float(os.getenv("VERIFICATION_CACHE_TTL", "300"))
+# Threads that run argon2, it releases the GIL so they hash in parallel.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# Unix socket of the daemon, empty uses the one in FILEPATH.
+DAEMON_SOCKET = os.getenv("DAEMON_SOCKET", "")
+# Address of the API server, API_SOCKET (a Unix socket) over host and port.
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8765"))
+API_SOCKET = os.getenv("API_SOCKET", "")
+# Seconds between the stores of the changes made through the API.
+API_FLUSH_INTERVAL = float(os.getenv("API_FLUSH_INTERVAL", "1"))
@@ -10,3 +10,18 @@ TASK_TITLE_LENGTH = 20
 TASK_DESCRIPTION_LENGTH = 60
 CURRENT_USER_PATH = "current_user.JSON"
 SESSION_TIME = 30  # in minutes
+SESSIONS_PATH = "sessions.JSON"
+SESSION_TOKEN_BYTES = 24
+JOURNAL_PATH = "journal.JSONL"
+TASK_VIEW_PATH = "tasks.fixed"
+TASK_VIEW_INDEX_PATH = "tasks.fixed.index"
+SQLITE_PATH = "data.sqlite3"
+TASK_SHARDS_PATH = "tasks/"
+PARALLEL_LOAD_CHUNK_SIZE = 2**20  # in bytes
+# Argon2 cost profiles, "balanced" has the argon2-cffi defaults.
+ARGON2_PROFILES = {
+    "fast-test": {"time_cost": 1, "memory_cost": 8, "parallelism": 1},
+    "balanced": {"time_cost": 3, "memory_cost": 65536, "parallelism": 4},
+    "hardened": {"time_cost": 4, "memory_cost": 262144, "parallelism": 4},
+}
+DAEMON_SOCKET_PATH = "task_manager.sock"
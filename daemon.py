@@ -0,0 +1,150 @@
+import argparse
+import contextlib
+import os
+import signal
+import socketserver
+import sys
+import threading
+from io import BufferedIOBase
+from typing import Any, Dict, List, Optional
+
+import data_management
+from daemon_client import connect, get_socket_path, read_message, send_message
+from frontend.arg_interface import execute_command
+from logging_utils import get_logger
+
+
+logger = get_logger(__name__)
+
+
+class MessageWriter:
+    """Text stream that sends what's written as messages of a kind."""
+
+    def __init__(self, file: BufferedIOBase, kind: str):
+        self.file = file
+        self.kind = kind
+
+    def write(self, text: str) -> int:
+        if text:
+            send_message(self.file, {self.kind: text})
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+class MessageReader:
+    """Text stream that asks the client for each line read."""
+
+    def __init__(self, reader: BufferedIOBase, writer: BufferedIOBase):
+        self.reader = reader
+        self.writer = writer
+
+    def readline(self) -> str:
+        send_message(self.writer, {"input": True})
+        message = read_message(self.reader)
+        if message is None:
+            return ""
+        return message.get("input", "")
+
+
+class CommandHandler(socketserver.StreamRequestHandler):
+    """
+    Runs one command of a client against the resident state and stores
+    the changes. The output and questions of the command are relayed.
+    """
+
+    def handle(self) -> None:
+        request = read_message(self.rfile)
+        if request is None:
+            return
+        if request.get("shutdown"):
+            send_message(self.wfile, {"exit": 0})
+            threading.Thread(target=self.server.shutdown).start()
+            return
+        stdin = sys.stdin
+        sys.stdin = MessageReader(self.rfile, self.wfile)
+        try:
+            with contextlib.redirect_stdout(
+                MessageWriter(self.wfile, "output")
+            ), contextlib.redirect_stderr(MessageWriter(self.wfile, "error")):
+                exit_code = execute_command(request.get("argv", []))
+                data_management.data_saving()
+        except Exception as e:
+            logger.error(f"CommandHandler: Error: {e}")
+            exit_code = 1
+        finally:
+            sys.stdin = stdin
+        send_message(self.wfile, {"exit": exit_code})
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    """Unix socket server that runs the commands one at a time."""
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        logger.error(f"DaemonServer: Error: {sys.exc_info()[1]}")
+
+
+def serve_daemon() -> None:
+    """
+    Serves the commands over the Unix socket with the state loaded once, \
+    until it's stopped. The changes are stored after each command.
+    """
+    path = get_socket_path()
+    running = connect()
+    if running is not None:
+        running.close()
+        print(f"There's a daemon running at '{path}' already.")
+        return
+    with contextlib.suppress(FileNotFoundError):
+        # Left behind by a daemon that didn't stop cleanly.
+        os.remove(path)
+    # Loads the sets now, so the first command doesn't wait for them.
+    for set_name in list(data_management.state.loaders):
+        data_management.state[set_name]
+    server = DaemonServer(path, CommandHandler)
+    os.chmod(path, 0o600)
+    signal.signal(
+        signal.SIGTERM,
+        lambda signum, frame: threading.Thread(target=server.shutdown).start(),
+    )
+    logger.info(f"Daemon listening at '{path}'.")
+    print(f"Daemon listening at '{path}'.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        data_management.data_saving()
+        logger.info("Daemon stopped.")
+
+
+def stop_daemon() -> None:
+    """Asks the running daemon to stop."""
+    client = connect()
+    if client is None:
+        print("There's no daemon running.")
+        return
+    with client, client.makefile("rb") as reader, client.makefile(
+        "wb"
+    ) as writer:
+        send_message(writer, {"shutdown": True})
+        message: Optional[Dict] = read_message(reader)
+    print("Daemon stopped." if message is not None else "Daemon closed.")
+
+
+def run_daemon_command(argv: List[str]) -> None:
+    """Starts or stops the daemon."""
+    parser = argparse.ArgumentParser(
+        prog="task_manager daemon",
+        description="Keeps the data loaded and serves the commands.",
+    )
+    parser.add_argument("action", choices=["start", "stop"])
+    args = parser.parse_args(argv)
+    if args.action == "start":
+        serve_daemon()
+    else:
+        stop_daemon()
@@ -0,0 +1,91 @@
+import json
+import os
+import socket
+import sys
+from io import BufferedIOBase
+from typing import Dict, List, Optional
+
+from config import DAEMON_SOCKET, FILEPATH
+from constants import DAEMON_SOCKET_PATH
+
+# Options whose value is a path, the daemon runs in its own folder.
+PATH_OPTIONS = ("-f", "--file")
+
+
+def get_socket_path() -> str:
+    """Returns the path of the Unix socket of the daemon."""
+    return DAEMON_SOCKET or str(FILEPATH) + DAEMON_SOCKET_PATH
+
+
+def send_message(file: BufferedIOBase, message: Dict) -> None:
+    """Writes the message as one JSON line."""
+    file.write(json.dumps(message).encode("utf-8") + b"\n")
+    file.flush()
+
+
+def read_message(file: BufferedIOBase) -> Optional[Dict]:
+    """Returns the next JSON line message, None if the peer closed."""
+    line = file.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+def resolve_path_arguments(argv: List[str]) -> List[str]:
+    """Returns the arguments with the paths of PATH_OPTIONS made absolute."""
+    resolved = []
+    for position, argument in enumerate(argv):
+        option, equals, value = argument.partition("=")
+        if position > 0 and argv[position - 1] in PATH_OPTIONS:
+            argument = os.path.abspath(argument)
+        elif equals and option in PATH_OPTIONS:
+            argument = f"{option}={os.path.abspath(value)}"
+        resolved.append(argument)
+    return resolved
+
+
+def connect() -> Optional[socket.socket]:
+    """Returns a socket connected to the daemon, None if it isn't running."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(get_socket_path())
+        return client
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        return None
+
+
+def run_remote_command(argv: List[str]) -> Optional[int]:
+    """
+    Runs the command in the daemon, relaying its output and the answers
+    to its questions, and returns its exit code. None if there's no
+    daemon running, so the command has to run in this process.
+    The paths of the arguments are made absolute, but the environment
+    variables of this process don't apply, the daemon uses its own.
+    Protocol, one JSON object per line:
+        client: {"argv": [...]}, then {"input": line} for each question
+        daemon: {"output": text}, {"error": text}, {"input": true},
+                {"exit": code}
+    """
+    client = connect()
+    if client is None:
+        return None
+    with client, client.makefile("rb") as reader, client.makefile(
+        "wb"
+    ) as writer:
+        send_message(writer, {"argv": resolve_path_arguments(argv)})
+        while True:
+            message = read_message(reader)
+            if message is None:
+                print("The daemon closed the connection.", file=sys.stderr)
+                return 1
+            if "output" in message:
+                sys.stdout.write(message["output"])
+                sys.stdout.flush()
+            elif "error" in message:
+                sys.stderr.write(message["error"])
+                sys.stderr.flush()
+            elif "input" in message:
+                send_message(writer, {"input": sys.stdin.readline()})
+            elif "exit" in message:
+                return message["exit"]
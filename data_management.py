@@ -1,19 +1,155 @@
+import contextlib
+import functools
 import json
-from typing import Any, Dict
+import os
+import threading
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+    Type,
+    TypeGuard,
+)
 
-from config import FILEPATH
-from constants import OPERATIONS
+from config import (
+    ATOMIC_WRITES,
+    FILEPATH,
+    FSYNC_DIRECTORY,
+    JOURNAL_COMPACTION_SIZE,
+    JOURNAL_ENABLED,
+    LOAD_EXECUTOR,
+    LOAD_WORKERS,
+    MMAP_TASK_VIEW,
+    SNAPSHOT_FORMAT,
+    STORAGE_BACKEND,
+    STREAMING_LOAD,
+    TASK_SHARD_PREFIX_LENGTH,
+    TASK_SHARDS,
+    TASK_STORE,
+)
+from constants import (
+    JOURNAL_PATH,
+    OPERATIONS,
+    PARALLEL_LOAD_CHUNK_SIZE,
+    SQLITE_PATH,
+    TASK_SHARDS_PATH,
+    TASK_VIEW_INDEX_PATH,
+    TASK_VIEW_PATH,
+)
 from error_management.exceptions import FileError
 from logging_utils import get_logger
-from models import DataEntitySet
+from models import DataEntity, DataEntitySet, Task, TaskSet, mutation_lock
+
+# The storage modules are imported by the functions of their settings, so a
+# command doesn't pay for the ones it doesn't use.
+if TYPE_CHECKING:
+    import sqlite3
+    from concurrent.futures import Executor
+
+    from mmap_store import MmapTaskView
+    from sharded_store import ShardedTaskSet
+    from sqlite_backend import SQLiteDataEntitySet
 
 
 logger = get_logger(__name__)
+
+
+class LazyState(dict):
+    """
+    Dictionary that builds the values with a registered loader the first
+    time each key is read, so only the used files are loaded.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.loaders: Dict[str, Callable[[], Any]] = {}
+        self._lock = threading.RLock()
+
+    def __missing__(self, key: str) -> Any:
+        with self._lock:
+            if dict.__contains__(self, key):
+                return dict.__getitem__(self, key)
+            loader = self.loaders.get(key)
+            if loader is None:
+                raise KeyError(key)
+            value = loader()
+            self[key] = value
+            return value
+
+    def register_loader(self, key: str, loader: Callable[[], Any]) -> None:
+        """Drops the loaded value of the key and loads it lazily again."""
+        with self._lock:
+            self.loaders[key] = loader
+            self.pop(key, None)
+
+    def is_loaded(self, key: str) -> bool:
+        """Returns True if the key has a value, without loading it."""
+        return dict.__contains__(self, key)
+
+
 # We use a state here becouse a dictinary maintain the references, not copies.
-# It stores the data on sets of objects.
-state: dict[str, Any] = {
-    "current_user": {"user": None, "loged_in_datetime": None}
-}
+# It stores the data on sets of objects, loaded on first access.
+# The current_user Session is set by session_management.
+state: LazyState = LazyState({"current_user": None})
+
+
+@functools.lru_cache(maxsize=None)
+def get_new_file_mode() -> int:
+    """Returns the mode open() gives to new files, 0o666 without umask."""
+    # The umask can only be read by replacing it.
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+def atomic_write(
+    path: str, write: Callable[[IO], None], binary: bool = False
+) -> None:
+    """
+    Calls write with a temporary file in the same folder, syncs it and
+    replaces the file at path with it, so readers see the old or the new
+    file, never a partial one.
+    """
+    import tempfile
+
+    directory = os.path.dirname(os.path.abspath(path))
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(file_descriptor, "wb" if binary else "w") as file:
+            write(file)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            os.chmod(temporary_path, os.stat(path).st_mode)
+        else:
+            # mkstemp creates it only readable by the owner.
+            os.chmod(temporary_path, get_new_file_mode())
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary_path)
+        raise
+    if FSYNC_DIRECTORY:
+        directory_descriptor = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_descriptor)
+        finally:
+            os.close(directory_descriptor)
+
+
+def atomic_json_dump(path: str, data: Any) -> None:
+    """Writes the data as JSON into the file at path atomically."""
+    atomic_write(
+        path, lambda file: json.dump(data, file, indent=4, sort_keys=True)
+    )
 
 
 def data_object_loading(
@@ -21,15 +157,19 @@ def data_object_loading(
 ) -> Any:
     """
     Gets the file and returns the data or gets the data
-    and stores it into the file.
+    and stores it into the file, returning True.
     """
     try:
         path = str(FILEPATH) + object_path
+        if operation == "w" and ATOMIC_WRITES and data is not None:
+            atomic_json_dump(path, data)
+            return True
         with open(path, operation) as file:
             if operation == "r":
                 return json.load(file)
             if operation == "w" and data is not None:
                 json.dump(data, file, indent=4, sort_keys=True)
+                return True
             else:
                 raise FileError("Operation not defined.")
     except FileNotFoundError as fnfe:
@@ -58,6 +198,400 @@ def data_object_loading(
         return None
 
 
+def data_object_streaming(object_path: str) -> Iterator[Dict]:
+    """
+    Yields the items of the JSON array in the file one by one, so the
+    memory used is bounded by one item instead of the whole file.
+    """
+    from json_streaming import iter_json_array
+
+    path = str(FILEPATH) + object_path
+    try:
+        with open(path, "rb") as file:
+            yield from iter_json_array(file)
+    except FileNotFoundError as fnfe:
+        logger.warning(
+            f"data_object_streaming: FileNotFoundError: \
+                The file at '{path}' was not found. {fnfe}"
+        )
+    except json.JSONDecodeError as jse:
+        logger.warning(
+            f"data_object_streaming: JSONDecodeError: \
+                The file at '{path}' is not a valid JSON array. {jse}"
+        )
+    except Exception as e:
+        logger.error(
+            f"data_object_streaming: Error: \
+                An unexpected error occurred when streaming the file: {e}"
+        )
+
+
+def get_snapshot_path(object: Type[DataEntity]) -> str:
+    """Returns the path of the snapshot file in the configured format."""
+    if SNAPSHOT_FORMAT == "json":
+        return object.filepath
+    from serializers import get_serializer
+
+    extension = get_serializer(SNAPSHOT_FORMAT).extension
+    return os.path.splitext(object.filepath)[0] + extension
+
+
+def data_snapshot_loading(object: Type[DataEntity]) -> Any:
+    """
+    Returns the items stored in the snapshot of the configured format, \
+    None if there's no snapshot.
+    """
+    from serializers import get_serializer
+
+    path = str(FILEPATH) + get_snapshot_path(object)
+    serializer = get_serializer(SNAPSHOT_FORMAT)
+    try:
+        with open(path, "rb" if serializer.binary else "r") as file:
+            return serializer.load(file)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(
+            f"data_snapshot_loading: Error: \
+                The snapshot at '{path}' couldn't be loaded: {e}"
+        )
+        return None
+
+
+def data_snapshot_saving(object: Type[DataEntity], data: Any) -> bool:
+    """Stores the items in the snapshot of the configured format."""
+    from serializers import get_serializer
+
+    path = str(FILEPATH) + get_snapshot_path(object)
+    serializer = get_serializer(SNAPSHOT_FORMAT)
+    names = [name[1:] for name in object.get_attribute_names()]
+    try:
+        atomic_write(
+            path,
+            lambda file: serializer.dump(data, names, file),
+            serializer.binary,
+        )
+        return True
+    except Exception as e:
+        logger.error(
+            f"data_snapshot_saving: Error: \
+                The snapshot at '{path}' couldn't be stored: {e}"
+        )
+        return False
+
+
+def read_set_data(object: Type[DataEntity]) -> Any:
+    """
+    Returns the items of the object file, from the snapshot of the \
+    configured format if there's one, else from the JSON file.
+    """
+    if SNAPSHOT_FORMAT != "json":
+        data = data_snapshot_loading(object)
+        if data is not None:
+            return data
+    if STREAMING_LOAD:
+        return data_object_streaming(object.filepath)
+    return data_object_loading(object.filepath, OPERATIONS["reading"])
+
+
+def write_set_data(object: Type[DataEntity], data: Any) -> bool:
+    """Stores the items of the object in the configured format."""
+    if SNAPSHOT_FORMAT != "json":
+        written = data_snapshot_saving(object, data)
+    else:
+        written = bool(
+            data_object_loading(object.filepath, OPERATIONS["writing"], data)
+        )
+    if written and object is Task and MMAP_TASK_VIEW:
+        write_task_view(data)
+    return written
+
+
+def write_task_view(data: Any) -> None:
+    """Stores the tasks in the fixed width file and its offset index."""
+    from mmap_store import write_fixed_width_tasks
+
+    try:
+        index: Dict = {}
+
+        def write(file: IO) -> None:
+            index.update(write_fixed_width_tasks(data, file))
+
+        atomic_write(str(FILEPATH) + TASK_VIEW_PATH, write, binary=True)
+        atomic_json_dump(str(FILEPATH) + TASK_VIEW_INDEX_PATH, index)
+    except Exception as e:
+        logger.error(f"write_task_view: Error: {e}")
+
+
+def remove_task_view() -> None:
+    """Removes the fixed width file of the tasks and its index, if any."""
+    for path in (TASK_VIEW_PATH, TASK_VIEW_INDEX_PATH):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(str(FILEPATH) + path)
+
+
+def get_task_view() -> Optional["MmapTaskView"]:
+    """
+    Returns the memory mapped view of the tasks, None if it's disabled, \
+    the tasks aren't stored in the JSON backend or it's older than them.
+    """
+    if not MMAP_TASK_VIEW or TASK_SHARDS or STORAGE_BACKEND != "json":
+        return None
+    from mmap_store import MmapTaskView
+
+    view_path = str(FILEPATH) + TASK_VIEW_PATH
+    try:
+        snapshot_path = str(FILEPATH) + get_snapshot_path(Task)
+        if os.path.getmtime(view_path) < os.path.getmtime(snapshot_path):
+            return None
+        if JOURNAL_ENABLED and (
+            os.path.exists(journal.compacting_path)
+            or (
+                os.path.exists(journal.path)
+                and os.path.getsize(journal.path) > 0
+            )
+        ):
+            return None
+        return MmapTaskView(view_path, str(FILEPATH) + TASK_VIEW_INDEX_PATH)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"get_task_view: The task view wasn't used: {e}")
+        return None
+
+
+@contextlib.contextmanager
+def get_task_reader() -> Iterator[Any]:
+    """
+    Yields the object used to read tasks: the taskset if it's loaded, \
+    else the memory mapped view if it's usable, else the loaded taskset. \
+    The view is closed when the block ends.
+    """
+    if not state.is_loaded("taskset"):
+        task_view = get_task_view()
+        if task_view is not None:
+            with task_view:
+                yield task_view
+            return
+    yield state["taskset"]
+
+
+class Journal:
+    """
+    Append-only file with the changes made to the sets after the last
+    snapshot, one JSON record per line. The compaction folds it into a new
+    snapshot; while it runs, the previous records wait in a side file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.compacting_path = f"{path}.compacting"
+        self.records = 0
+        self.lock = threading.RLock()
+        self._file: Optional[TextIO] = None
+        self._compaction: Optional[threading.Thread] = None
+
+    def get_listener(
+        self, set_name: str, uuid_key: str
+    ) -> Callable[[str, DataEntity, Dict], None]:
+        """Returns a DataEntitySet listener that journals its changes."""
+
+        def listener(
+            operation: str, data_entity: DataEntity, previous_values: Dict
+        ) -> None:
+            record: Dict[str, Any] = {"set": set_name, "op": operation}
+            if operation == "add":
+                record["data"] = data_entity.get_data()
+            else:
+                record["uuid"] = previous_values.get(
+                    uuid_key, data_entity.get_value(uuid_key)
+                )
+                record["data"] = {
+                    key: data_entity.get_value(key) for key in previous_values
+                }
+                if isinstance(data_entity, Task):
+                    # The owner it had, the sharded set finds it with it.
+                    record["owner_uuid"] = previous_values.get(
+                        "owner_uuid", data_entity.get_value("owner_uuid")
+                    )
+            self.append(record)
+
+        return listener
+
+    def append(self, record: Dict) -> None:
+        """Writes the record at the end of the journal."""
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, "a")
+            self._file.write(json.dumps(record, sort_keys=True) + "\n")
+            self._file.flush()
+            self.records += 1
+            if self.records >= JOURNAL_COMPACTION_SIZE:
+                self.start_compaction()
+
+    def replay(self, set_name: str, data_set: DataEntitySet) -> None:
+        """Applies the journaled records of the set to it."""
+        for path in (self.compacting_path, self.path):
+            if not os.path.exists(path):
+                continue
+            records = 0
+            with open(path, "r") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as jse:
+                        logger.warning(
+                            f"Journal.replay: JSONDecodeError: \
+                                Ignoring a partial record in '{path}'. {jse}"
+                        )
+                        continue
+                    if record["set"] == set_name:
+                        apply_journal_record(data_set, record)
+                    records += 1
+            if path == self.path:
+                self.records = records
+
+    def rotate(self) -> None:
+        """Moves the current records to the side file of the compaction."""
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                if os.path.exists(self.compacting_path):
+                    # A failed compaction left its records, the new ones
+                    # follow them so both are replayed in order.
+                    import shutil
+
+                    with open(self.path, "rb") as current, open(
+                        self.compacting_path, "ab+"
+                    ) as compacting:
+                        if compacting.seek(0, os.SEEK_END) > 0:
+                            compacting.seek(-1, os.SEEK_END)
+                            if compacting.read(1) != b"\n":
+                                # Ends the partial record it had.
+                                compacting.write(b"\n")
+                        shutil.copyfileobj(current, compacting)
+                        compacting.flush()
+                        os.fsync(compacting.fileno())
+                    os.remove(self.path)
+                else:
+                    os.replace(self.path, self.compacting_path)
+            self.records = 0
+
+    def start_compaction(self) -> None:
+        """Runs compact_journal in a background thread."""
+        with self.lock:
+            if self._compaction is not None and self._compaction.is_alive():
+                return
+            self._compaction = threading.Thread(
+                target=compact_journal, name="journal-compaction"
+            )
+            self._compaction.start()
+
+    def close(self) -> None:
+        """Waits for a running compaction and closes the journal file."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+journal = Journal(str(FILEPATH) + JOURNAL_PATH)
+
+
+def apply_journal_record(data_set: DataEntitySet, record: Dict) -> None:
+    """
+    Applies one journal record to the set, it can be applied more than
+    once with the same result.
+    """
+    data = record["data"]
+    if is_sharded_set(data_set):
+        apply_sharded_journal_record(data_set, record)
+        return
+    if record["op"] == "add":
+        existing = data_set.get_data_entity_by_uuid(
+            data[data_set.get_uuid_key()]
+        )
+        if existing is None:
+            data_set.add_jSON(data)
+        else:
+            existing.udpate(data)
+    else:
+        data_entity = data_set.get_data_entity_by_uuid(record["uuid"])
+        if data_entity is not None:
+            data_entity.udpate(data)
+
+
+def apply_sharded_journal_record(
+    data_set: "ShardedTaskSet", record: Dict
+) -> None:
+    """
+    Applies the journal record reading only the shard of the task owner, \
+    an update of a shard that isn't loaded waits until it's loaded.
+    """
+    data = record["data"]
+    if record["op"] == "add":
+        data_set.load_shard(data_set.get_shard_key(data["owner_uuid"]))
+        existing = data_set.get_loaded_data_entity(
+            data[data_set.get_uuid_key()]
+        )
+        if existing is None:
+            data_set.add_jSON(data)
+        else:
+            existing.udpate(data)
+    elif "owner_uuid" in record:
+        data_set.update_stored(record["owner_uuid"], record["uuid"], data)
+    else:
+        # Journaled without the owner, every shard may have to be read.
+        data_entity = data_set.get_data_entity_by_uuid(record["uuid"])
+        if data_entity is not None:
+            data_entity.udpate(data)
+
+
+def compact_journal() -> None:
+    """Folds the journal into a new snapshot of every set."""
+    try:
+        logger.info("Compacting journal...")
+        taskset = state["taskset"] if state.is_loaded("taskset") else None
+        if is_sharded_set(taskset):
+            # Their waiting updates are only in the journal being folded.
+            for shard in taskset.get_pending_shards():
+                taskset.load_shard(shard)
+        # The sets don't change while they're copied.
+        with mutation_lock, journal.lock:
+            dumps = {}
+            shard_dumps = {}
+            sharded_set: Optional["ShardedTaskSet"] = None
+            for data_set, object in get_sets_and_object().items():
+                dataset = state[data_set.__name__.lower()]
+                if is_sharded_set(dataset):
+                    sharded_set = dataset
+                    shard_dumps = {
+                        shard: dataset.dump_shard(shard)
+                        for shard in dataset.get_dirty_shards()
+                    }
+                else:
+                    dumps[object] = dataset.dump()
+            journal.rotate()
+        for object, dump in dumps.items():
+            if not write_set_data(object, dump):
+                raise FileError(f"The {object.__name__} data wasn't stored.")
+        for shard, dump in shard_dumps.items():
+            if not write_task_shard(shard, dump):
+                raise FileError(f"The task shard {shard} wasn't stored.")
+        if sharded_set is not None:
+            # Only after every shard is written, or they'd stay unsaved.
+            sharded_set.mark_shards_clean(shard_dumps)
+        os.remove(journal.compacting_path)
+        logger.info("Finished compacting journal.")
+    except Exception as e:
+        logger.error(f"compact_journal: Error: {e}")
+
+
 def get_sets_and_object() -> Dict:
     """Returns a dictionary with the sets as keys the objects as values."""
     try:
@@ -79,37 +613,335 @@ def get_sets_and_object() -> Dict:
         return {}
 
 
+def get_set_implementation(
+    data_set: Type[DataEntitySet],
+) -> Type[DataEntitySet]:
+    """Returns the configured implementation of the DataEntitySet."""
+    if data_set is TaskSet and TASK_STORE == "columnar":
+        from columnar import ColumnarTaskSet
+
+        return ColumnarTaskSet
+    return data_set
+
+
+_load_executor: Optional["Executor"] = None
+
+
+def get_load_executor() -> "Executor":
+    """Returns the pool of the parallel loading, creating it first time."""
+    global _load_executor
+    if _load_executor is None:
+        from parallel_loading import create_executor
+
+        _load_executor = create_executor(LOAD_WORKERS, LOAD_EXECUTOR)
+    return _load_executor
+
+
+def start_parallel_reading(
+    object: Type[DataEntity],
+) -> Optional[Callable[[], Any]]:
+    """
+    Starts decoding the JSON file of the object in the pool and returns \
+    the function that waits for its items. None if the file isn't read \
+    from a whole JSON file.
+    """
+    if (
+        LOAD_WORKERS <= 0
+        or STORAGE_BACKEND != "json"
+        or SNAPSHOT_FORMAT != "json"
+        or STREAMING_LOAD
+        or (object is Task and TASK_SHARDS)
+    ):
+        return None
+    from parallel_loading import submit_json_decoding
+
+    path = str(FILEPATH) + object.filepath
+    try:
+        get_result = submit_json_decoding(
+            get_load_executor(), path, LOAD_WORKERS, PARALLEL_LOAD_CHUNK_SIZE
+        )
+    except Exception as e:
+        logger.error(f"start_parallel_reading: Error: {e}")
+        return None
+
+    def read_data() -> Any:
+        try:
+            return get_result()
+        except json.JSONDecodeError as jse:
+            logger.warning(
+                f"start_parallel_reading: JSONDecodeError: \
+                    The file at '{path}' is not a valid JSON file. {jse}"
+            )
+        except Exception as e:
+            logger.error(
+                f"start_parallel_reading: Error: \
+                    The file at '{path}' couldn't be decoded: {e}"
+            )
+        return None
+
+    return read_data
+
+
+def get_task_shard_path(shard: str) -> str:
+    """Returns the path of the shard file, relative to FILEPATH."""
+    return f"{TASK_SHARDS_PATH}{shard}{os.path.splitext(Task.filepath)[1]}"
+
+
+def list_task_shards() -> List[str]:
+    """Returns the keys of the stored task shards."""
+    extension = os.path.splitext(Task.filepath)[1]
+    try:
+        return [
+            file_name[: -len(extension)]
+            for file_name in os.listdir(str(FILEPATH) + TASK_SHARDS_PATH)
+            if file_name.endswith(extension)
+        ]
+    except FileNotFoundError:
+        return []
+
+
+def read_task_shard(shard: str) -> Any:
+    """Returns the tasks stored in the shard file."""
+    return data_object_loading(
+        get_task_shard_path(shard), OPERATIONS["reading"]
+    )
+
+
+def write_task_shard(shard: str, data: List[Dict]) -> bool:
+    """Stores the tasks of the shard into its file."""
+    os.makedirs(str(FILEPATH) + TASK_SHARDS_PATH, exist_ok=True)
+    return bool(
+        data_object_loading(
+            get_task_shard_path(shard), OPERATIONS["writing"], data
+        )
+    )
+
+
+def is_sharded_set(data_set: Any) -> TypeGuard["ShardedTaskSet"]:
+    """Returns True if the set is sharded, only TASK_SHARDS creates them."""
+    if not TASK_SHARDS:
+        return False
+    from sharded_store import ShardedTaskSet
+
+    return isinstance(data_set, ShardedTaskSet)
+
+
+def load_sharded_task_set() -> "ShardedTaskSet":
+    """
+    Returns the sharded TaskSet with only the shard of the session user \
+    loaded, the others are read when they're needed.
+    """
+    from sharded_store import ShardedTaskSet
+
+    loaded_set = ShardedTaskSet(
+        read_task_shard,
+        list_task_shards(),
+        TASK_SHARD_PREFIX_LENGTH,
+        get_load_executor() if LOAD_WORKERS > 0 else None,
+    )
+    session = state["current_user"]
+    if session is not None and session.user is not None:
+        loaded_set.load_shard(
+            loaded_set.get_shard_key(session.user.get_user_uuid())
+        )
+    return loaded_set
+
+
+def migrate_task_shards() -> List[str]:
+    """
+    Splits the tasks file into the shard files and returns the written \
+    paths. The tasks file is kept, it's no longer read with TASK_SHARDS.
+    """
+    if list_task_shards():
+        raise FileError(
+            f"There are task shards in '{FILEPATH}{TASK_SHARDS_PATH}' already."
+        )
+    from sharded_store import get_shard_key
+
+    data = read_set_data(Task)
+    if data is None:
+        raise FileError(f"There's no '{Task.filepath}' file to migrate.")
+    shards: Dict[str, List[Dict]] = {}
+    for item in data:
+        shard = get_shard_key(item["owner_uuid"], TASK_SHARD_PREFIX_LENGTH)
+        shards.setdefault(shard, []).append(item)
+    written = []
+    for shard, shard_data in sorted(shards.items()):
+        if not write_task_shard(shard, shard_data):
+            raise FileError(f"The task shard {shard} wasn't stored.")
+        written.append(get_task_shard_path(shard))
+    logger.info(f"Migrated {Task.filepath} into {len(written)} shards.")
+    return written
+
+
+_connection: Optional["sqlite3.Connection"] = None
+
+
+def get_connection() -> "sqlite3.Connection":
+    """Returns the SQLite connection, opening it the first time."""
+    global _connection
+    if _connection is None:
+        from sqlite_backend import open_connection
+
+        _connection = open_connection(str(FILEPATH) + SQLITE_PATH)
+    return _connection
+
+
+def load_sqlite_set(
+    data_set: Type[DataEntitySet], object: Type[DataEntity]
+) -> "SQLiteDataEntitySet":
+    """
+    Opens the set over its SQLite table. An empty table is filled with \
+    the items of the JSON file, if there's one.
+    """
+    from sqlite_backend import SQLITE_SETS
+
+    loaded_set = SQLITE_SETS[data_set](get_connection())
+    if object is Task:
+        # Left by the JSON backend, the table changes without it.
+        remove_task_view()
+    if len(loaded_set) == 0:
+        data = read_set_data(object)
+        if data is not None:
+            loaded_set.add_rows(list(data))
+            get_connection().commit()
+            logger.info(f"Imported {object.filepath} into SQLite.")
+    return loaded_set
+
+
+def load_data_set(
+    data_set: Type[DataEntitySet],
+    object: Type[DataEntity],
+    read_data: Optional[Callable[[], Any]] = None,
+) -> DataEntitySet:
+    """
+    Loads the set from its file, or from read_data if the file is being \
+    decoded in parallel, replaying and attaching the journal if it's \
+    enabled. With LOAD_WORKERS the file is decoded in parallel here, \
+    when the set is first accessed.
+    """
+    set_name = data_set.__name__.lower()
+    if STORAGE_BACKEND == "sqlite":
+        return load_sqlite_set(data_set, object)
+    logger.info(f"Loading {set_name}...")
+    if data_set is TaskSet and TASK_SHARDS:
+        loaded_set = load_sharded_task_set()
+    else:
+        if read_data is None:
+            read_data = start_parallel_reading(object)
+        data = read_set_data(object) if read_data is None else read_data()
+        loaded_set = get_set_implementation(data_set)(data)
+    if JOURNAL_ENABLED:
+        journal.replay(set_name, loaded_set)
+        loaded_set.add_listener(
+            journal.get_listener(set_name, loaded_set.get_uuid_key())
+        )
+    logger.info(f"Finished loading {set_name}.")
+    return loaded_set
+
+
 def data_loading() -> None:
-    """Loads the data from the files into the sets of objects."""
+    """
+    Registers the loaders of the sets of objects, each one is loaded \
+    from its file the first time it's accessed in the state.
+    """
     try:
-        logger.info("Loading data...")
         sets_and_objects = get_sets_and_object()
         # Left a separated for because it's more readable
         for data_set, object in sets_and_objects.items():
-            state[data_set.__name__.lower()] = data_set(
-                data_object_loading(object.filepath, OPERATIONS["reading"])
+            state.register_loader(
+                data_set.__name__.lower(),
+                functools.partial(load_data_set, data_set, object),
             )
-        logger.info("Finished loading data.")
     except Exception as e:
         logger.error(f"data_loading: Error: {e}")
 
 
-def data_saving() -> None:
-    """Storages the data from the sets of objects into the files."""
+def save_task_shards(dataset: "ShardedTaskSet") -> List[str]:
+    """
+    Stores only the changed shards of the set and returns their paths, \
+    the set is marked as stored if every shard was written.
+    """
+    written = []
+    for shard in sorted(dataset.get_dirty_shards()):
+        if write_task_shard(shard, dataset.dump_shard(shard)):
+            written.append(get_task_shard_path(shard))
+    if len(written) == len(dataset.get_dirty_shards()):
+        dataset.mark_clean()
+    return written
+
+
+def data_saving() -> List[str]:
+    """
+    Storages the data from the changed sets of objects into the files and
+    returns the paths of the written files.
+    """
+    flushed: List[str] = []
     try:
+        if STORAGE_BACKEND == "sqlite":
+            # Every change is already written, it only needs the commit.
+            if _connection is not None and _connection.in_transaction:
+                _connection.commit()
+                flushed.append(SQLITE_PATH)
+            for data_set in get_sets_and_object().keys():
+                if state.is_loaded(data_set.__name__.lower()):
+                    state[data_set.__name__.lower()].mark_clean()
+            logger.info(f"SQLite committed: {bool(flushed)}.")
+            return flushed
+        if JOURNAL_ENABLED:
+            # Every change is already in the journal.
+            journal.close()
+            logger.info("Journal closed.")
+            return flushed
         logger.info("Saving data...")
         sets_and_objects = get_sets_and_object()
         # Left a separated for because it's more readable
         for data_set, object in sets_and_objects.items():
+            if not state.is_loaded(data_set.__name__.lower()):
+                continue
             dataset: DataEntitySet = state[data_set.__name__.lower()]
-            data_object_loading(
-                object.filepath, OPERATIONS["writing"], dataset.dump()
-            )
-        logger.info("Finished saving data.")
+            if not dataset.is_dirty():
+                continue
+            if is_sharded_set(dataset):
+                flushed.extend(save_task_shards(dataset))
+                continue
+            if write_set_data(object, dataset.dump()):
+                dataset.mark_clean()
+                flushed.append(get_snapshot_path(object))
+        flushed_text = ", ".join(flushed) if flushed else "nothing"
+        logger.info(f"Finished saving data, flushed: {flushed_text}.")
     except Exception as e:
         logger.error(f"data_saving: Error: {e}")
+    return flushed
+
+
+def has_unsaved_changes() -> bool:
+    """Returns True if a loaded set changed since it was stored."""
+    return any(
+        state.is_loaded(data_set.__name__.lower())
+        and state[data_set.__name__.lower()].is_dirty()
+        for data_set in get_sets_and_object().keys()
+    )
+
+
+def data_exporting(folder: Optional[str] = None) -> List[str]:
+    """
+    Exports every set into its JSON file in the folder, FILEPATH by \
+    default, whatever the snapshot format or storage backend is, and \
+    returns the written paths.
+    """
+    exported: List[str] = []
+    try:
+        for data_set, object in get_sets_and_object().items():
+            dump = state[data_set.__name__.lower()].dump()
+            path = os.path.join(folder or str(FILEPATH), object.filepath)
+            atomic_json_dump(path, dump)
+            exported.append(path)
+    except Exception as e:
+        logger.error(f"data_exporting: Error: {e}")
+    return exported
 
 
-def get_persistent_data() -> Dict:
+def get_persistent_data() -> LazyState:
     """Returns the state with all the sets of data and the current user."""
     return state
@@ -1,5 +1,11 @@
 import sys
 import argparse
+import contextlib
+import functools
+import io
+import json
+import shlex
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import data_management
 from constants import (
@@ -9,16 +15,22 @@ from constants import (
     TASK_TITLE_LENGTH,
     TASK_DESCRIPTION_LENGTH,
 )
+from error_management.exceptions import InputError, SessionError
 from services import (
+    change_password,
     create_new_user,
     create_task,
     delete_task,
     edit_task,
+    export_data,
+    import_users,
     list_user_tasks,
     login,
+    login_with_token,
     logout,
+    migrate_tasks_to_shards,
 )
-from session_management import verify_session_expired
+from session_management import use_session_token, verify_session_expired
 from utils import (
     is_valid_description_arg,
     is_valid_name_arg,
@@ -27,38 +39,24 @@ from utils import (
     is_valid_task_status_arg,
     is_valid_title_arg,
     verify_task_uuid_arg,
+    verify_uuid_arg,
 )
 
 
 state = data_management.get_persistent_data()
 
 
-def create_paser() -> argparse.ArgumentParser:
-    """Creates the argument parser and subparsers for each command."""
-    parser = argparse.ArgumentParser(
-        prog="task_manager", description="Task Manager 20000 CLI"
-    )
-    subparsers = parser.add_subparsers(dest="command", required=True)
-
-    # Create users command group
-    users_parser = subparsers.add_parser("users", help="Manage user commands")
-    users_subparsers = users_parser.add_subparsers(
-        dest="user_command", required=True, help="Users subcommands"
-    )
-
-    # Create user
-    parser_create_user = users_subparsers.add_parser(
-        "create", help="Create a new user", aliases=["add"]
-    )
-    parser_create_user.add_argument(
+def add_create_user_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of users create."""
+    parser.add_argument(
         "-n",
         "--name",
         dest="name",
         required=True,
-        type=is_valid_not_existing_name_arg,
+        type=is_valid_name_arg,
         help=f"Alphanumeric name of {USERNAME_LENGTH} characters",
     )
-    parser_create_user.add_argument(
+    parser.add_argument(
         "-p",
         "--password",
         dest="password",
@@ -67,11 +65,10 @@ def create_paser() -> argparse.ArgumentParser:
         help=f"Alphanumeric password of {PASSWORD_LENGTH} characters",
     )
 
-    # Login
-    parser_login = users_subparsers.add_parser(
-        "login", help="Login as a user", aliases=["log"]
-    )
-    parser_login.add_argument(
+
+def add_login_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of users login."""
+    parser.add_argument(
         "-n",
         "--name",
         dest="name",
@@ -79,7 +76,7 @@ def create_paser() -> argparse.ArgumentParser:
         type=is_valid_name_arg,
         help="Username",
     )
-    parser_login.add_argument(
+    parser.add_argument(
         "-p",
         "--password",
         dest="password",
@@ -87,28 +84,48 @@ def create_paser() -> argparse.ArgumentParser:
         type=is_valid_pass_arg,
         help="Password",
     )
-
-    # Logout
-    parser_login = users_subparsers.add_parser(
-        "logout", help="Logout current user", aliases=["lout"]
+    parser.add_argument(
+        "--token",
+        dest="token",
+        action="store_true",
+        help="Start a session of its own and print its token",
     )
 
-    # Create tasks command group
-    tasks_parser = subparsers.add_parser("tasks", help="Manage task commands")
-    tasks_subparsers = tasks_parser.add_subparsers(
-        dest="task_command", required=True, help="Tasks subcommands"
-    )
 
-    # List tasks
-    tasks_subparsers.add_parser(
-        "list-tasks", help="List your tasks", aliases=["list"]
+def add_import_users_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of users import."""
+    parser.add_argument(
+        "-f",
+        "--file",
+        dest="file",
+        required=True,
+        help='JSON list of {"name": ..., "password": ...} objects',
     )
 
-    # Create task
-    parser_create_task = tasks_subparsers.add_parser(
-        "create-task", help="Create a new task", aliases=["add"]
+
+def add_change_password_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of users change-password."""
+    parser.add_argument(
+        "-p",
+        "--password",
+        dest="password",
+        required=True,
+        type=is_valid_pass_arg,
+        help="Current password",
     )
-    parser_create_task.add_argument(
+    parser.add_argument(
+        "-np",
+        "--new-password",
+        dest="new_password",
+        required=True,
+        type=is_valid_pass_arg,
+        help=f"Alphanumeric password of {PASSWORD_LENGTH} characters",
+    )
+
+
+def add_task_text_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the title and description arguments of a task."""
+    parser.add_argument(
         "-t",
         "--title",
         dest="title",
@@ -116,7 +133,7 @@ def create_paser() -> argparse.ArgumentParser:
         type=is_valid_title_arg,
         help=f"Task title ({TASK_TITLE_LENGTH})",
     )
-    parser_create_task.add_argument(
+    parser.add_argument(
         "-d",
         "--description",
         dest="description",
@@ -125,35 +142,19 @@ def create_paser() -> argparse.ArgumentParser:
         help=f"Task description ({TASK_DESCRIPTION_LENGTH})",
     )
 
-    # Edit task
-    parser_edit_task = tasks_subparsers.add_parser(
-        "edit-task", help="Edit a task", aliases=["mod"]
-    )
-    parser_edit_task.add_argument(
+
+def add_edit_task_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of tasks edit-task."""
+    parser.add_argument(
         "-id",
         "--uuid",
         dest="uuid",
         required=True,
-        type=verify_task_uuid_arg,
+        type=verify_uuid_arg,
         help="Task UUID to edit",
     )
-    parser_edit_task.add_argument(
-        "-t",
-        "--title",
-        dest="title",
-        required=True,
-        type=is_valid_title_arg,
-        help=f"Task title ({TASK_TITLE_LENGTH})",
-    )
-    parser_edit_task.add_argument(
-        "-d",
-        "--description",
-        dest="description",
-        required=True,
-        type=is_valid_description_arg,
-        help=f"Task description ({TASK_DESCRIPTION_LENGTH})",
-    )
-    parser_edit_task.add_argument(
+    add_task_text_arguments(parser)
+    parser.add_argument(
         "-s",
         "--status",
         dest="status",
@@ -163,36 +164,255 @@ def create_paser() -> argparse.ArgumentParser:
         help=f"Task status: {', '.join(TASK_STATUSES.values())}",
     )
 
-    # Delete task
-    parser_delete_task = tasks_subparsers.add_parser(
-        "delete-task", help="Delete a task", aliases=["del"]
-    )
-    parser_delete_task.add_argument(
+
+def add_delete_task_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of tasks delete-task."""
+    parser.add_argument(
         "-id",
         "--uuid",
         dest="uuid",
         required=True,
-        type=verify_task_uuid_arg,
+        type=verify_uuid_arg,
         help="Task UUID to delete",
     )
 
+
+def add_batch_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of batch."""
+    parser.add_argument(
+        "-f",
+        "--file",
+        dest="file",
+        help="Script or JSONL file of commands, stdin by default",
+    )
+
+
+def add_export_arguments(parser: argparse.ArgumentParser) -> None:
+    """Adds the arguments of export."""
+    parser.add_argument(
+        "-f",
+        "--folder",
+        dest="folder",
+        help="Folder of the JSON files, FILEPATH by default",
+    )
+
+
+# Command groups: (help, subcommand dest, subcommands help).
+COMMAND_GROUPS = {
+    "users": ("Manage user commands", "user_command", "Users subcommands"),
+    "tasks": ("Manage task commands", "task_command", "Tasks subcommands"),
+}
+# Subcommands of each group: name: (aliases, help, arguments function).
+COMMANDS: Dict[str, Dict[str, Tuple[List[str], str, Optional[Callable]]]] = {
+    "users": {
+        "create": (["add"], "Create a new user", add_create_user_arguments),
+        "login": (["log"], "Login as a user", add_login_arguments),
+        "import": (
+            [],
+            "Create the users of a JSON file",
+            add_import_users_arguments,
+        ),
+        "change-password": (
+            ["pass"],
+            "Change your password",
+            add_change_password_arguments,
+        ),
+        "logout": (["lout"], "Logout current user", None),
+    },
+    "tasks": {
+        "list-tasks": (["list"], "List your tasks", None),
+        "create-task": (["add"], "Create a new task", add_task_text_arguments),
+        "edit-task": (["mod"], "Edit a task", add_edit_task_arguments),
+        "delete-task": (["del"], "Delete a task", add_delete_task_arguments),
+        "migrate-shards": (
+            [],
+            "Split the tasks file into one file per owner UUID prefix",
+            None,
+        ),
+    },
+}
+# Commands without subcommands: name: (help, arguments function).
+STANDALONE_COMMANDS: Dict[str, Tuple[str, Callable]] = {
+    "batch": (
+        "Run many commands in one process and store the data once",
+        add_batch_arguments,
+    ),
+    "export": (
+        "Write every set into a JSON file, whatever the storage is",
+        add_export_arguments,
+    ),
+}
+# Validators that read the data, they run once the arguments are parsed:
+# (group, subcommand): [(dest, option, argparse type function)].
+DATA_VALIDATORS: Dict[Tuple[str, str], List[Tuple[str, str, Callable]]] = {
+    ("users", "create"): [
+        ("name", "-n/--name", is_valid_not_existing_name_arg)
+    ],
+    ("tasks", "edit-task"): [("uuid", "-id/--uuid", verify_task_uuid_arg)],
+    ("tasks", "delete-task"): [("uuid", "-id/--uuid", verify_task_uuid_arg)],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def create_paser(
+    group: Optional[str] = None, subcommand: Optional[str] = None
+) -> argparse.ArgumentParser:
+    """
+    Creates the argument parser and subparsers for each command, or only \
+    for the subcommand of the group when they're given. The parsers are \
+    cached, the daemon builds each one once.
+    """
+    parser = argparse.ArgumentParser(
+        prog="task_manager", description="Task Manager 20000 CLI"
+    )
+    parser.add_argument(
+        "--session",
+        dest="session_token",
+        help="Token of a session started with users login --token",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for group_name, group_values in COMMAND_GROUPS.items():
+        if group is not None and group_name != group:
+            continue
+        group_help, subcommand_dest, subcommands_help = group_values
+        group_parser = subparsers.add_parser(group_name, help=group_help)
+        group_subparsers = group_parser.add_subparsers(
+            dest=subcommand_dest, required=True, help=subcommands_help
+        )
+        for name, (aliases, command_help, add_arguments) in COMMANDS[
+            group_name
+        ].items():
+            if subcommand is not None and name != subcommand:
+                continue
+            command_parser = group_subparsers.add_parser(
+                name, help=command_help, aliases=aliases
+            )
+            if add_arguments is not None:
+                add_arguments(command_parser)
+            # The data validators report their errors with it.
+            command_parser.set_defaults(command_parser=command_parser)
+    for name, (command_help, add_arguments) in STANDALONE_COMMANDS.items():
+        if group is not None and name != group:
+            continue
+        add_arguments(subparsers.add_parser(name, help=command_help))
+
     return parser
 
 
-def define_command_args(parser: argparse.ArgumentParser) -> None:
+def get_subcommand_name(group: str, subcommand: str) -> Optional[str]:
+    """Returns the name of the subcommand or alias of the group."""
+    for name, (aliases, _, _) in COMMANDS.get(group, {}).items():
+        if subcommand == name or subcommand in aliases:
+            return name
+    return None
+
+
+def get_command_name(argv: List[str]) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns the group and subcommand name of the arguments, without \
+    parsing them. None if they aren't found or there are other options \
+    before them, like --help.
+    """
+    positionals: List[str] = []
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument == "--session":
+            next(arguments, None)
+        elif argument.startswith("--session="):
+            continue
+        elif argument.startswith("-"):
+            return None, None
+        elif argument in STANDALONE_COMMANDS and not positionals:
+            return argument, None
+        else:
+            positionals.append(argument)
+            if len(positionals) == 2:
+                break
+    if len(positionals) < 2:
+        return None, None
+    group, subcommand = positionals
+    name = get_subcommand_name(group, subcommand)
+    if name is None:
+        return None, None
+    return group, name
+
+
+def get_command_parser(
+    argv: Optional[List[str]] = None,
+) -> argparse.ArgumentParser:
+    """
+    Returns the parser with only the subcommand of the arguments, the \
+    whole parser if it isn't known, so argparse reports the error.
+    """
+    group, subcommand = get_command_name(
+        sys.argv[1:] if argv is None else argv
+    )
+    if group is None:
+        return create_paser()
+    return create_paser(group, subcommand)
+
+
+def validate_command_data(args: argparse.Namespace) -> None:
+    """
+    Runs the validators that read the data on the parsed arguments, \
+    exits with the subcommand parser error if one fails.
+    """
+    group = args.command
+    if group not in COMMAND_GROUPS:
+        return
+    _, subcommand_dest, _ = COMMAND_GROUPS[group]
+    subcommand = get_subcommand_name(group, getattr(args, subcommand_dest))
+    if subcommand is None:
+        return
+    validators = DATA_VALIDATORS.get((group, subcommand), [])
+    for dest, option, validator in validators:
+        try:
+            validator(getattr(args, dest))
+        except argparse.ArgumentTypeError as ate:
+            args.command_parser.error(f"argument {option}: {ate}")
+
+
+def define_command_args(
+    parser: argparse.ArgumentParser, argv: Optional[List[str]] = None
+) -> None:
     """Decides the correct command."""
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    validate_command_data(args)
+    is_logout = getattr(args, "user_command", None) in ("logout", "lout")
+    if args.session_token is None or is_logout:
+        dispatch_command(args)
+        return
+    try:
+        with use_session_token(args.session_token):
+            dispatch_command(args)
+    except SessionError as se:
+        print(se.message)
+        sys.exit(1)
 
+
+def dispatch_command(args: argparse.Namespace) -> None:
+    """Runs the command of the parsed arguments."""
     match args.command:
         case "users":
             match args.user_command:
                 case "create" | "add":
                     create_new_user(args.name, args.password)
                 case "login" | "log":
-                    login(args.name, args.password)
+                    if args.token:
+                        login_with_token(args.name, args.password)
+                    else:
+                        login(args.name, args.password)
+                case "import":
+                    import_users(args.file)
+                case "change-password" | "pass":
+                    if verify_session_expired():
+                        print("No user logged in.")
+                        sys.exit(1)
+                    change_password(args.password, args.new_password)
                 case "logout" | "lout":
-                    logout()
+                    logout(args.session_token)
                 case _:
                     print("Unrecognized user subcommand.")
         case "tasks":
@@ -203,7 +423,6 @@ def define_command_args(parser: argparse.ArgumentParser) -> None:
                         sys.exit(1)
                     list_user_tasks()
                 case "create-task" | "add":
-                    print(" *********** ")
                     if verify_session_expired():
                         print("No user logged in.")
                         sys.exit(1)
@@ -232,13 +451,126 @@ def define_command_args(parser: argparse.ArgumentParser) -> None:
                         print("Deletion cancelled.")
                         sys.exit(0)
                     delete_task(args.uuid)
+                case "migrate-shards":
+                    migrate_tasks_to_shards()
                 case _:
                     print("Unrecognized task subcommand.")
+        case "batch":
+            run_batch(args.file)
+        case "export":
+            if not export_data(args.folder):
+                sys.exit(1)
         case _:
             print("This command is not recognized.")
 
 
-def run_command() -> None:
+def run_command(argv: Optional[List[str]] = None) -> None:
     """Run the command line interface and returs True if one was excecuted."""
-    parser = create_paser()
-    define_command_args(parser)
+    parser = get_command_parser(argv)
+    define_command_args(parser, argv)
+
+
+def execute_command(argv: List[str]) -> int:
+    """
+    Runs the command of the arguments and returns its exit code, the \
+    exits of argparse and the commands are caught.
+    """
+    try:
+        run_command(argv)
+        return 0
+    except SystemExit as se:
+        if se.code is None or isinstance(se.code, int):
+            return se.code or 0
+        print(se.code, file=sys.stderr)
+        return 1
+
+
+def read_batch_operation(
+    line: str,
+) -> Tuple[Any, List[str], Optional[str]]:
+    """
+    Returns the id, the arguments and the answers of a batch line. It's \
+    a command like in the shell, or a JSON object: {"id": ..., "argv": \
+    [...] or "command": "...", "input": "y"}.
+    """
+    if not line.startswith("{"):
+        return None, shlex.split(line), None
+    operation = json.loads(line)
+    if not isinstance(operation, dict):
+        raise InputError("The operation must be a JSON object.")
+    argv = operation.get("argv")
+    if argv is None and "command" in operation:
+        if not isinstance(operation["command"], str):
+            raise InputError("The command of the operation must be a text.")
+        argv = shlex.split(operation["command"])
+    if not isinstance(argv, list) or not all(
+        isinstance(argument, str) for argument in argv
+    ):
+        raise InputError("The operation needs an argv list or a command.")
+    input_text = operation.get("input")
+    if input_text is not None and not isinstance(input_text, str):
+        raise InputError("The input of the operation must be a text.")
+    return operation.get("id"), argv, input_text
+
+
+def run_batch_operation(argv: List[str], input_text: Optional[str]) -> Dict:
+    """
+    Runs one command of a batch with input_text as its answers and \
+    returns its exit code and what it printed.
+    """
+    if get_command_name(argv)[0] == "batch":
+        raise InputError("A batch can't run another batch.")
+    output = io.StringIO()
+    error = io.StringIO()
+    stdin = sys.stdin
+    sys.stdin = io.StringIO(input_text or "")
+    try:
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(
+            error
+        ):
+            exit_code = execute_command(argv)
+    except Exception as e:
+        error.write(f"{type(e).__name__}: {e}")
+        exit_code = 1
+    finally:
+        sys.stdin = stdin
+    return {
+        "exit": exit_code,
+        "output": output.getvalue(),
+        "error": error.getvalue(),
+    }
+
+
+def run_batch(file_path: Optional[str] = None) -> None:
+    """
+    Runs the commands of the file or stdin, one per line, against the \
+    loaded data and writes a JSON result line as each one finishes. The \
+    data is stored once, after the batch. Exits with 1 if one failed.
+    """
+    try:
+        source = sys.stdin if file_path is None else open(file_path, "r")
+    except OSError as oe:
+        print(f"The file '{file_path}' can't be read: {oe.strerror}.")
+        sys.exit(1)
+    failed = 0
+    try:
+        for number, line in enumerate(iter(source.readline, ""), start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            operation_id = None
+            try:
+                operation_id, argv, input_text = read_batch_operation(line)
+                result = run_batch_operation(argv, input_text)
+            except InputError as ie:
+                result = {"exit": 1, "output": "", "error": ie.message}
+            except ValueError as ve:
+                result = {"exit": 1, "output": "", "error": str(ve)}
+            print(json.dumps({"line": number, "id": operation_id, **result}))
+            sys.stdout.flush()
+            failed += result["exit"] != 0
+    finally:
+        if file_path is not None:
+            source.close()
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,112 @@
+import json
+from typing import Any, BinaryIO, Iterator
+
+try:
+    import ijson  # type: ignore[import-not-found]
+except ImportError:
+    ijson = None
+
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\n\r"
+
+
+def iter_json_array(file: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """
+    Yields the items of the JSON array in the file one by one, so only the
+    current item is kept in memory. It uses ijson when it's installed.
+    """
+    if ijson is not None:
+        return ijson.items(file, "item", use_float=True)
+    return _iter_json_array(file, chunk_size)
+
+
+def _iter_json_array(file: BinaryIO, chunk_size: int) -> Iterator[Any]:
+    """Pure Python array tokenizer that decodes each item with raw_decode."""
+    decoder = json.JSONDecoder()
+    reader = _ChunkReader(file, chunk_size)
+
+    reader.skip_whitespace()
+    reader.expect("[")
+    reader.skip_whitespace()
+    if reader.peek() == "]":
+        return
+    while True:
+        reader.skip_whitespace()
+        yield reader.decode(decoder)
+        reader.skip_whitespace()
+        if reader.peek() == "]":
+            return
+        reader.expect(",")
+
+
+class _ChunkReader:
+    """Text buffer over a binary file that is refilled on demand."""
+
+    def __init__(self, file: BinaryIO, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        # Keeps multibyte characters split between chunks.
+        self._pending = b""
+
+    def _fill(self) -> bool:
+        """Reads one more chunk, returns False at the end of the file."""
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            if self._pending:
+                raise json.JSONDecodeError(
+                    "Truncated UTF-8 sequence", self.buffer, len(self.buffer)
+                )
+            return False
+        data = self._pending + chunk
+        try:
+            text = data.decode("utf-8")
+            self._pending = b""
+        except UnicodeDecodeError as ude:
+            text = data[: ude.start].decode("utf-8")
+            self._pending = data[ude.start :]
+        # Drops the consumed text so the buffer stays about one item long.
+        self.buffer = self.buffer[self.position :] + text
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """Returns the next character without consuming it."""
+        while self.position >= len(self.buffer):
+            if not self._fill():
+                raise json.JSONDecodeError(
+                    "Unexpected end of the array", self.buffer, self.position
+                )
+        return self.buffer[self.position]
+
+    def skip_whitespace(self) -> None:
+        while self.peek() in WHITESPACE:
+            self.position += 1
+
+    def expect(self, character: str) -> None:
+        if self.peek() != character:
+            raise json.JSONDecodeError(
+                f"Expecting '{character}'", self.buffer, self.position
+            )
+        self.position += 1
+
+    def decode(self, decoder: json.JSONDecoder) -> Any:
+        """Decodes the next value, reading chunks until it's complete."""
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+                # A value that reaches the end of the buffer, like a number,
+                # may continue in the next chunk.
+                if end < len(self.buffer) or self.eof:
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
@@ -1,25 +1,49 @@
 import sys
 
-from dotenv import load_dotenv
-
-from data_management import data_loading
+from daemon_client import run_remote_command
 from error_management.exceptions import AppError
-from frontend.interface import main_menu, welcome
-from frontend.arg_interface import run_command
-from logging_utils import configure_logger
-from session_management import load_session
 
 
 def main():
     """Calls tha main initializing functions."""
     try:
+        is_daemon_command = sys.argv[1:2] == ["daemon"]
+        is_api_command = sys.argv[1:2] == ["api"]
+        if len(sys.argv) > 1 and not (is_daemon_command or is_api_command):
+            # A running daemon has everything loaded already.
+            exit_code = run_remote_command(sys.argv[1:])
+            if exit_code is not None:
+                sys.exit(exit_code)
+        # Each command imports only the modules it uses, so the startup
+        # doesn't pay for the menu, the servers or the ones it skips.
+        from dotenv import load_dotenv
+
+        from data_management import data_loading, data_saving
+        from logging_utils import configure_logger
+        from session_management import load_session
+
         load_dotenv()
         configure_logger()
         data_loading()
         load_session()
-        if len(sys.argv) > 1:
-            run_command()
+        if is_daemon_command:
+            from daemon import run_daemon_command
+
+            run_daemon_command(sys.argv[2:])
+        elif is_api_command:
+            from api_server import run_api_server
+
+            run_api_server()
+        elif len(sys.argv) > 1:
+            from frontend.arg_interface import run_command
+
+            try:
+                run_command()
+            finally:
+                data_saving()
         else:
+            from frontend.interface import main_menu, welcome
+
             welcome()
             main_menu()
     except Exception as e:
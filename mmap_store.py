@@ -0,0 +1,169 @@
+import json
+import mmap
+import struct
+import uuid
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from constants import TASK_DESCRIPTION_LENGTH, TASK_TITLE_LENGTH
+from error_management.exceptions import TaskSetError
+from models import Task
+
+# Byte width of each Task attribute in a record, UTF-8 needs up to 4 bytes
+# per character.
+RECORD_FIELDS: Tuple[Tuple[str, int], ...] = (
+    ("task_uuid", 36),
+    ("owner_uuid", 36),
+    ("status", 16),
+    ("deleted", 1),
+    ("creation_datetime", 20),
+    ("update_datetime", 20),
+    ("title", TASK_TITLE_LENGTH * 4),
+    ("description", TASK_DESCRIPTION_LENGTH * 4),
+)
+RECORD_STRUCT = struct.Struct(
+    "<" + "".join(f"{width}s" for _, width in RECORD_FIELDS)
+)
+# Magic, generation UUID shared with the index and record count.
+HEADER_STRUCT = struct.Struct("<4s16sI")
+MAGIC = b"DFW1"
+
+
+def encode_record(data: Dict) -> bytes:
+    """Returns the fixed width record of the Task data."""
+    values = []
+    for key, width in RECORD_FIELDS:
+        value = data.get(key)
+        if key == "deleted":
+            encoded = b"\x01" if value else b"\x00"
+        else:
+            encoded = (value or "").encode("utf-8")
+        if len(encoded) > width:
+            raise TaskSetError(
+                f"The {key} of the task {data.get('task_uuid')} is longer \
+                    than {width} bytes."
+            )
+        values.append(encoded)
+    return RECORD_STRUCT.pack(*values)
+
+
+def decode_record(buffer: mmap.mmap, offset: int) -> Dict:
+    """Returns the Task data of the record at the offset."""
+    data = {}
+    for (key, _), value in zip(
+        RECORD_FIELDS, RECORD_STRUCT.unpack_from(buffer, offset)
+    ):
+        if key == "deleted":
+            data[key] = value == b"\x01"
+        else:
+            data[key] = value.rstrip(b"\x00").decode("utf-8")
+    return data
+
+
+def write_fixed_width_tasks(records: Iterable[Dict], file: IO) -> Dict:
+    """
+    Writes the Task records into the binary file and returns its offset
+    index: rows by task_uuid and by owner_uuid.
+    """
+    records = list(records)
+    generation = uuid.uuid4()
+    file.write(HEADER_STRUCT.pack(MAGIC, generation.bytes, len(records)))
+    tasks: Dict[str, int] = {}
+    owners: Dict[str, List[int]] = {}
+    for row, data in enumerate(records):
+        file.write(encode_record(data))
+        tasks[data["task_uuid"]] = row
+        owners.setdefault(data["owner_uuid"], []).append(row)
+    return {
+        "generation": str(generation),
+        "count": len(records),
+        "tasks": tasks,
+        "owners": owners,
+    }
+
+
+class MmapTaskView:
+    """
+    Read-only view of the Tasks in a fixed width file. Only the offset
+    index is loaded, each record is decoded when it's requested.
+    It offers the TaskSet read methods, the returned Tasks aren't linked to
+    a set so their changes aren't stored.
+    """
+
+    def __init__(self, path: str, index_path: str):
+        self._file = open(path, "rb")
+        try:
+            self._buffer = mmap.mmap(
+                self._file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            magic, generation, count = HEADER_STRUCT.unpack_from(
+                self._buffer, 0
+            )
+            with open(index_path, "r") as index_file:
+                index = json.load(index_file)
+            if (
+                magic != MAGIC
+                or str(uuid.UUID(bytes=generation)) != index["generation"]
+                or count != index["count"]
+                or len(self._buffer)
+                != HEADER_STRUCT.size + count * RECORD_STRUCT.size
+            ):
+                raise TaskSetError(
+                    f"The task view {path} doesn't match its index."
+                )
+        except Exception:
+            self.close()
+            raise
+        self._count = count
+        self._tasks: Dict[str, int] = index["tasks"]
+        self._owners: Dict[str, List[int]] = index["owners"]
+
+    def __enter__(self) -> "MmapTaskView":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[Task]:
+        return (self._get_task(row) for row in range(self._count))
+
+    def _get_task(self, row: int) -> Task:
+        offset = HEADER_STRUCT.size + row * RECORD_STRUCT.size
+        return Task(**decode_record(self._buffer, offset))
+
+    def get_task_by_uuid(self, uuid: str) -> Optional[Task]:
+        """Returns the Task with the UUID, None if it doesn't exist."""
+        row = self._tasks.get(uuid)
+        return None if row is None else self._get_task(row)
+
+    def get_user_tasks(
+        self,
+        owner_uuid: str,
+        filter_status: Optional[str] = None,
+        inclue_delete: bool = False,
+    ) -> Set[Task]:
+        """
+        Returns the Tasks of the User, decoding only their records, it can
+        be filtered by deleted and status values.
+        """
+        tasks = (
+            self._get_task(row) for row in self._owners.get(owner_uuid, [])
+        )
+        return {
+            task
+            for task in tasks
+            if (inclue_delete or not task.get_value("deleted"))
+            and (
+                filter_status is None
+                or task.get_value("status") == filter_status
+            )
+        }
+
+    def close(self) -> None:
+        """Releases the memory map and the file."""
+        buffer = getattr(self, "_buffer", None)
+        if buffer is not None:
+            buffer.close()
+        self._file.close()
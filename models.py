@@ -1,5 +1,16 @@
+import threading
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Set, Type
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
 import uuid
 
 from constants import DATETIME_FORMAT, TASK_STATUSES
@@ -10,6 +21,11 @@ from error_management.exceptions import (
     UserSetError,
 )
 from error_management.exception_utils import data_object_exception_manager
+from queries import Predicate, where
+
+# Held by every change of the sets and their items, the snapshots taken
+# from other threads hold it too so they don't see a change half done.
+mutation_lock = threading.RLock()
 
 
 class DataEntity:
@@ -17,41 +33,98 @@ class DataEntity:
     Entity that allows it's childer with data get dynamically it's attributes
     and updated them dynamically too. It's used to load and contain \
     corresponding JSON objects defined in the filepath.
+    The data attributes are declared in the __slots__ of each child, so the
+    objects don't carry a __dict__.
     """
 
+    __slots__ = ("_data_entity_sets", "_dirty")
     filepath: str = ""
 
     @data_object_exception_manager
     def __init__(self):
         super().__init__()
 
+    @classmethod
+    def get_attribute_names(cls) -> Tuple[str, ...]:
+        """
+        Returns the names of the data attributes defined in the current \
+        class, including their underscore prefix.
+        """
+        return cls.__dict__["__slots__"]
+
     @data_object_exception_manager
     def get_data(self) -> Dict:
         """
         Get a dictionary with all the attributes define in the current class.
         """
-        return {key[1:]: value for key, value in vars(self).items()}
+        return {
+            key[1:]: getattr(self, key) for key in self.get_attribute_names()
+        }
+
+    @data_object_exception_manager
+    def get_value(self, key: str) -> Any:
+        """
+        Returns the value of one attribute without building the whole \
+        data dictionary.
+        """
+        return getattr(self, f"_{key}")
 
     @data_object_exception_manager
     def udpate(self, json: Dict) -> None:
         """
         Updates all the received attributes in a dictionary defined \
-        in the current class.
+        in the current class and keeps the indexes of it's sets in sync.
         """
         if isinstance(json, Dict):
-            for key, value in json.items():
-                new_key = f"_{key}"
-                if hasattr(self, new_key):
-                    setattr(self, new_key, value)
-                else:
-                    raise AttributeError(f"attribute {new_key}")
+            attribute_names = self.get_attribute_names()
+            for key in json.keys():
+                if f"_{key}" not in attribute_names:
+                    raise AttributeError(f"attribute _{key}")
+            with mutation_lock:
+                previous_values = {}
+                for key, value in json.items():
+                    previous_values[key] = getattr(self, f"_{key}")
+                    setattr(self, f"_{key}", value)
+                self._dirty = True
+                for data_entity_set in self.get_data_entity_sets():
+                    data_entity_set.entity_updated(self, previous_values)
         else:
             raise TypeError("json should be a Dict.")
 
+    def attach_data_entity_set(self, data_entity_set: "DataEntitySet") -> None:
+        """Registers a set that keeps indexes over this entity."""
+        self._data_entity_sets = self.get_data_entity_sets() + (
+            data_entity_set,
+        )
+
+    def get_data_entity_sets(self) -> Tuple["DataEntitySet", ...]:
+        """Returns the sets that keep indexes over this entity."""
+        return getattr(self, "_data_entity_sets", ())
+
+    def mark_dirty(self) -> None:
+        """Flags the entity as changed since it was last stored."""
+        self._dirty = True
+
+    def mark_clean(self) -> None:
+        """Flags the entity as stored."""
+        self._dirty = False
+
+    def is_dirty(self) -> bool:
+        """Returns True if the entity changed since it was last stored."""
+        return getattr(self, "_dirty", False)
+
 
 class User(DataEntity):
     """User with credentials defined by an UUID."""
 
+    __slots__ = (
+        "_user_uuid",
+        "_name",
+        "_password",
+        "_deleted",
+        "_creation_datetime",
+        "_update_datetime",
+    )
     filepath: str = "users.JSON"
 
     def __init__(
@@ -98,6 +171,16 @@ class User(DataEntity):
 class Task(DataEntity):
     """Task related to a User defined by a UUID."""
 
+    __slots__ = (
+        "_task_uuid",
+        "_title",
+        "_description",
+        "_status",
+        "_deleted",
+        "_creation_datetime",
+        "_update_datetime",
+        "_owner_uuid",
+    )
     filepath: str = "tasks.JSON"
 
     def __init__(
@@ -191,12 +274,26 @@ class DataEntitySet(Set):
     """
 
     related_class: Type["DataEntity"] = DataEntity
+    # Attributes with unique values, each one gets a hash index.
+    indexed_keys: Tuple[str, ...] = ()
+    # Attribute shared by many entities, it gets a secondary index with
+    # buckets partitioned by the values of the partition_keys.
+    grouped_key: Optional[str] = None
+    partition_keys: Tuple[str, ...] = ()
 
     @data_object_exception_manager
     def __init__(self, json_list: Optional[List] = None) -> None:
+        self._indexes: Dict[str, Dict[Any, DataEntity]] = {
+            key: {} for key in self.indexed_keys
+        }
+        self._group_index: Dict[Any, Dict[Tuple, Set[DataEntity]]] = {}
+        self._listeners: List[Callable[[str, DataEntity, Dict], None]] = []
+        self._dirty_entities: Set[DataEntity] = set()
         if json_list is not None:
             for data_entity in json_list:
                 self.add_jSON(data_entity)
+            # The loaded data is already stored.
+            self.mark_clean()
         else:
             return super().__init__()
 
@@ -204,7 +301,14 @@ class DataEntitySet(Set):
     def add(self, data_entity: DataEntity) -> None:
         """Adds DataEntity or child object into the set, verifying it."""
         if isinstance(data_entity, self.related_class):
-            super().add(data_entity)
+            with mutation_lock:
+                if data_entity not in self:
+                    super().add(data_entity)
+                    self.index_data_entity(data_entity)
+                    data_entity.attach_data_entity_set(self)
+                    data_entity.mark_dirty()
+                    self._dirty_entities.add(data_entity)
+                    self._notify("add", data_entity, {})
         else:
             raise TypeError(
                 f"data_entity should be type {self.related_class}."
@@ -218,7 +322,8 @@ class DataEntitySet(Set):
             for data_entity in dataEntities
             if isinstance(data_entity, self.related_class)
         ]
-        super().update(filtered_dataEntities)
+        for data_entity in filtered_dataEntities:
+            self.add(data_entity)
 
     @data_object_exception_manager
     def add_jSON(self, json: Dict) -> None:
@@ -229,15 +334,176 @@ class DataEntitySet(Set):
         if isinstance(json, Dict):
             attributes = {
                 attr[1:]: json.get(attr[1:], None)
-                for attr in self.related_class.__dict__[
-                    "__static_attributes__"
-                ]
+                for attr in self.related_class.get_attribute_names()
             }
             data_entity = self.related_class(**attributes)
             self.add(data_entity)
         else:
             raise TypeError("json should be type a Dict")
 
+    @data_object_exception_manager
+    def index_data_entity(self, data_entity: DataEntity) -> None:
+        """Adds the DataEntity to every index of the DataEntitySet."""
+        for key, index in self._indexes.items():
+            index[data_entity.get_value(key)] = data_entity
+        if self.grouped_key is not None:
+            self._add_to_group(
+                data_entity,
+                data_entity.get_value(self.grouped_key),
+                self._get_partition(data_entity, {}),
+            )
+
+    @data_object_exception_manager
+    def add_listener(
+        self, listener: Callable[[str, DataEntity, Dict], None]
+    ) -> None:
+        """
+        Registers a function called after each change with the operation \
+        ("add" or "update"), the DataEntity and the previous values of \
+        the updated attributes.
+        """
+        self._listeners.append(listener)
+
+    def _notify(
+        self, operation: str, data_entity: DataEntity, previous_values: Dict
+    ) -> None:
+        """Calls the listeners with the change."""
+        for listener in self._listeners:
+            listener(operation, data_entity, previous_values)
+
+    @data_object_exception_manager
+    def entity_updated(
+        self, data_entity: DataEntity, previous_values: Dict
+    ) -> None:
+        """
+        Called by DataEntity.udpate, it reindexes the DataEntity and \
+        notifies the listeners.
+        """
+        self.reindex(data_entity, previous_values)
+        self._dirty_entities.add(data_entity)
+        self._notify("update", data_entity, previous_values)
+
+    def is_dirty(self) -> bool:
+        """Returns True if an item was added or updated since last stored."""
+        return bool(self._dirty_entities)
+
+    def get_dirty_entities(self) -> Set[DataEntity]:
+        """Returns the items added or updated since the set was stored."""
+        return set(self._dirty_entities)
+
+    @data_object_exception_manager
+    def mark_clean(self) -> None:
+        """Flags the set and its dirty items as stored."""
+        for data_entity in self._dirty_entities:
+            data_entity.mark_clean()
+        self._dirty_entities = set()
+
+    @data_object_exception_manager
+    def reindex(self, data_entity: DataEntity, previous_values: Dict) -> None:
+        """
+        Moves the DataEntity in the indexes of the updated attributes, \
+        previous_values has the values it had before the update.
+        """
+        for key, previous_value in previous_values.items():
+            index = self._indexes.get(key)
+            if index is None:
+                continue
+            if index.get(previous_value) is data_entity:
+                del index[previous_value]
+            index[data_entity.get_value(key)] = data_entity
+        grouping_keys = (self.grouped_key,) + self.partition_keys
+        if self.grouped_key is not None and any(
+            key in previous_values for key in grouping_keys
+        ):
+            previous_group = previous_values.get(
+                self.grouped_key, data_entity.get_value(self.grouped_key)
+            )
+            self._remove_from_group(
+                data_entity,
+                previous_group,
+                self._get_partition(data_entity, previous_values),
+            )
+            self._add_to_group(
+                data_entity,
+                data_entity.get_value(self.grouped_key),
+                self._get_partition(data_entity, {}),
+            )
+
+    def _get_partition(self, data_entity: DataEntity, values: Dict) -> Tuple:
+        """
+        Returns the partition of the DataEntity, taking the values from \
+        the received dictionary first.
+        """
+        return tuple(
+            values[key] if key in values else data_entity.get_value(key)
+            for key in self.partition_keys
+        )
+
+    def _add_to_group(
+        self, data_entity: DataEntity, group: Any, partition: Tuple
+    ) -> None:
+        """Adds the DataEntity to the bucket of the group and partition."""
+        buckets = self._group_index.setdefault(group, {})
+        buckets.setdefault(partition, set()).add(data_entity)
+
+    def _remove_from_group(
+        self, data_entity: DataEntity, group: Any, partition: Tuple
+    ) -> None:
+        """Removes the DataEntity from the bucket of its group partition."""
+        buckets = self._group_index.get(group, {})
+        bucket = buckets.get(partition)
+        if bucket is None:
+            return
+        bucket.discard(data_entity)
+        if not bucket:
+            del buckets[partition]
+        if not buckets:
+            del self._group_index[group]
+
+    def has_index(self, key: str) -> bool:
+        """Returns True if the key has a hash index."""
+        return key in self._indexes
+
+    @data_object_exception_manager
+    def count_grouped_entities(
+        self, group: Any, partition_values: Optional[Dict] = None
+    ) -> int:
+        """
+        Returns the amount of items get_grouped_entities would yield, \
+        without iterating them.
+        """
+        partition_values = partition_values or {}
+        positions = [
+            (position, partition_values[key])
+            for position, key in enumerate(self.partition_keys)
+            if key in partition_values
+        ]
+        return sum(
+            len(bucket)
+            for partition, bucket in self._group_index.get(group, {}).items()
+            if all(partition[i] == value for i, value in positions)
+        )
+
+    @data_object_exception_manager
+    def get_grouped_entities(
+        self, group: Any, partition_values: Optional[Dict] = None
+    ) -> Iterator[DataEntity]:
+        """
+        Yields the items that have the grouped_key equal to group, only \
+        from the buckets that match the received partition values.
+        """
+        partition_values = partition_values or {}
+        positions = [
+            (position, partition_values[key])
+            for position, key in enumerate(self.partition_keys)
+            if key in partition_values
+        ]
+        # Copied, an update while iterating moves the item to other bucket.
+        buckets = list(self._group_index.get(group, {}).items())
+        for partition, bucket in buckets:
+            if all(partition[i] == value for i, value in positions):
+                yield from tuple(bucket)
+
     @data_object_exception_manager
     def get_data_entity_by_key(
         self, key: str, value: str
@@ -245,30 +511,43 @@ class DataEntitySet(Set):
         """
         Returns an item from the DataEntitySet that has the received \
         key with the corresponding value. If it doesn't exist return None.
+        Indexed keys are solved with a hash lookup.
         """
+        index = self._indexes.get(key)
+        if index is not None:
+            return index.get(value)
         for data_entity in self:
-            if data_entity.get_data()[key] == value:
+            if data_entity.get_value(key) == value:
                 return data_entity
         return None
 
+    @classmethod
+    def get_uuid_key(cls) -> str:
+        """Returns the name of the UUID attribute of the related_class."""
+        return f"{cls.related_class.__name__.lower()}_uuid"
+
     @data_object_exception_manager
     def get_data_entity_by_uuid(self, uuid: str) -> Optional[DataEntity]:
         """Returns an item from the DataEntitySet with the received UUID."""
-        class_name = self.related_class.__name__.lower()
-        return self.get_data_entity_by_key(f"{class_name}_uuid", uuid)
+        return self.get_data_entity_by_key(self.get_uuid_key(), uuid)
+
+    @data_object_exception_manager
+    def query(self, predicate: Predicate) -> Iterator[DataEntity]:
+        """
+        Returns a lazy iterator over the items that fulfill the predicate, \
+        the candidates come from the most selective index available.
+        """
+        return predicate.execute(self)
 
     @data_object_exception_manager
     def get_filtered_entities(self, key_values: Dict) -> Optional[Set]:
         """
-        Returns a set of related_class type that has the received \
+        Returns a set of related_class type that has all the received \
         attributes with their corresponding values.
         """
-        return {
-            item
-            for key in key_values.keys()
-            for item in self
-            if item.get_data().get(f"_{key}", None) == key_values[key]
-        }
+        if not key_values:
+            return set()
+        return set(self.query(where(**key_values)))
 
     @data_object_exception_manager
     def dump(self) -> List[Dict]:
@@ -302,6 +581,7 @@ class DataEntitySet(Set):
 
 class UserSet(DataEntitySet):
     related_class = User
+    indexed_keys = ("user_uuid", "name")
 
     def __init__(self, json_list: Optional[List] = None):
         super().__init__(json_list)
@@ -312,7 +592,7 @@ class UserSet(DataEntitySet):
         corresponding value. If it doesn't exist returns None.
         """
         try:
-            return super().get_data_entity_by_key(key, value)
+            return self.get_data_entity_by_key(key, value)
         except Exception as e:
             raise UserSetError(f"UserSet: in getUserByKey: {e}")
 
@@ -322,7 +602,7 @@ class UserSet(DataEntitySet):
         If it doesn't exist returns None.
         """
         try:
-            return super().get_data_entity_by_uuid(uuid)
+            return self.get_data_entity_by_uuid(uuid)
         except Exception as e:
             raise UserSetError(f"UserSet: in getUserByUuid: {e}")
 
@@ -346,6 +626,9 @@ class UserSet(DataEntitySet):
 
 class TaskSet(DataEntitySet):
     related_class = Task
+    indexed_keys = ("task_uuid",)
+    grouped_key = "owner_uuid"
+    partition_keys = ("status", "deleted")
 
     def __init__(self, json_list: Optional[List] = None):
         super().__init__(json_list)
@@ -356,7 +639,7 @@ class TaskSet(DataEntitySet):
         corresponding value. If it doesn't exist returns None.
         """
         try:
-            return super().get_data_entity_by_key(key, value)
+            return self.get_data_entity_by_key(key, value)
         except Exception as e:
             raise TaskSetError(f"TaskSet: in getTaskByKey: {e}")
 
@@ -366,7 +649,7 @@ class TaskSet(DataEntitySet):
         If it doesn't exist returns None.
         """
         try:
-            return super().get_data_entity_by_uuid(uuid)
+            return self.get_data_entity_by_uuid(uuid)
         except Exception as e:
             raise TaskSetError(f"TaskSet: in getTaskByUuid: {e}")
 
@@ -381,12 +664,12 @@ class TaskSet(DataEntitySet):
         deleted and status values.
         """
         try:
-            filter_data: Dict[Optional[str], Any] = {"owner_uuid": owner_uuid}
-            filter_data["status"] = (
-                filter_status if filter_status is not None else None
-            )
-            filter_data["deleted"] = False if inclue_delete else None
-            return super().get_filtered_entities(filter_data)
+            partition_values: Dict[str, Any] = {}
+            if filter_status is not None:
+                partition_values["status"] = filter_status
+            if not inclue_delete:
+                partition_values["deleted"] = False
+            return set(self.get_grouped_entities(owner_uuid, partition_values))
         except Exception as e:
             raise TaskSetError(f"TaskSet: in getUserTasks: {e}")
 
@@ -0,0 +1,74 @@
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from error_management.exceptions import FileError
+
+# End of a top level object in the files written with indent=4. JSON
+# strings can't hold raw newlines, so it only appears between array items.
+ITEM_SEPARATOR = b"\n    },"
+
+
+def create_executor(workers: int, kind: str) -> Executor:
+    """Returns a "process" or "thread" pool with the amount of workers."""
+    if kind == "process":
+        # multiprocessing is only imported when a process pool is used.
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=workers)
+    if kind == "thread":
+        return ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="data-loading"
+        )
+    raise FileError(f"Load executor '{kind}' is not defined.")
+
+
+def split_json_array(content: bytes, chunk_count: int) -> List[bytes]:
+    """
+    Splits the JSON array in up to chunk_count valid JSON arrays, cut
+    between its top level items. Other layouts than indent=4 aren't split.
+    """
+    cuts: List[int] = []
+    step = len(content) // max(chunk_count, 1)
+    for chunk in range(1, chunk_count):
+        start = max(step * chunk, cuts[-1] + 1 if cuts else 0)
+        cut = content.find(ITEM_SEPARATOR, start)
+        if cut == -1:
+            break
+        # The position of the comma after the item.
+        cuts.append(cut + len(ITEM_SEPARATOR) - 1)
+    if not cuts:
+        return [content]
+    chunks = [content[: cuts[0]] + b"]"]
+    for start, end in zip(cuts, cuts[1:]):
+        chunks.append(b"[" + content[start + 1 : end] + b"]")
+    chunks.append(b"[" + content[cuts[-1] + 1 :])
+    return chunks
+
+
+def submit_json_decoding(
+    executor: Executor, path: str, workers: int, chunk_size: int
+) -> Callable[[], Optional[List[Dict]]]:
+    """
+    Reads the JSON array file and decodes it in the pool, in chunks of at
+    least chunk_size bytes. Returns a function that waits for the chunks
+    and returns the merged items, None if the file doesn't exist.
+    """
+    try:
+        with open(path, "rb") as file:
+            content = file.read()
+    except FileNotFoundError:
+        return lambda: None
+    chunk_count = max(1, min(workers, len(content) // chunk_size))
+    futures = [
+        executor.submit(json.loads, chunk)
+        for chunk in split_json_array(content, chunk_count)
+    ]
+
+    def get_result() -> List[Dict]:
+        items: List[Dict] = []
+        for future in futures:
+            items.extend(future.result())
+        return items
+
+    return get_result
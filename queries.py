@@ -0,0 +1,212 @@
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from models import DataEntity, DataEntitySet
+
+
+# A plan is the estimated amount of candidates and the candidates iterable.
+Plan = Tuple[int, Iterable["DataEntity"]]
+
+
+class Predicate:
+    """
+    Condition over the attributes of a DataEntity. Predicates are composed
+    with & and | and executed lazily by DataEntitySet.query.
+    """
+
+    def matches(self, data_entity: "DataEntity") -> bool:
+        """Returns True if the DataEntity fulfills the condition."""
+        raise NotImplementedError
+
+    def plan(self, data_entity_set: "DataEntitySet") -> Optional[Plan]:
+        """
+        Returns the candidates an index can provide for this predicate,
+        or None if the whole set has to be scanned.
+        """
+        return None
+
+    def execute(
+        self, data_entity_set: "DataEntitySet"
+    ) -> Iterator["DataEntity"]:
+        """Yields the items of the set that fulfill the condition."""
+        plan = self.plan(data_entity_set)
+        candidates = plan[1] if plan is not None else data_entity_set
+        for data_entity in candidates:
+            if self.matches(data_entity):
+                yield data_entity
+
+    def __and__(self, other: "Predicate") -> "And":
+        return And(self, other)
+
+    def __or__(self, other: "Predicate") -> "Or":
+        return Or(self, other)
+
+
+class KeyPredicate(Predicate):
+    """Predicate over the value of only one attribute."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self._attribute = f"_{key}"
+
+    def get_value(self, data_entity: "DataEntity") -> Any:
+        """Returns the attribute value, None if it isn't defined."""
+        return getattr(data_entity, self._attribute, None)
+
+
+class Equals(KeyPredicate):
+    """The attribute is equal to the value."""
+
+    def __init__(self, key: str, value: Any):
+        super().__init__(key)
+        self.value = value
+
+    def matches(self, data_entity: "DataEntity") -> bool:
+        return self.get_value(data_entity) == self.value
+
+    def plan(self, data_entity_set: "DataEntitySet") -> Optional[Plan]:
+        if data_entity_set.has_index(self.key):
+            data_entity = data_entity_set.get_data_entity_by_key(
+                self.key, self.value
+            )
+            return (0, ()) if data_entity is None else (1, (data_entity,))
+        if self.key == data_entity_set.grouped_key:
+            return (
+                data_entity_set.count_grouped_entities(self.value),
+                data_entity_set.get_grouped_entities(self.value),
+            )
+        return None
+
+
+class Range(KeyPredicate):
+    """
+    The attribute is between lower (inclusive) and upper (exclusive),
+    a None limit is not checked.
+    """
+
+    def __init__(self, key: str, lower: Any = None, upper: Any = None):
+        super().__init__(key)
+        self.lower = lower
+        self.upper = upper
+
+    def matches(self, data_entity: "DataEntity") -> bool:
+        value = self.get_value(data_entity)
+        if value is None:
+            return False
+        if self.lower is not None and value < self.lower:
+            return False
+        if self.upper is not None and value >= self.upper:
+            return False
+        return True
+
+
+class Prefix(KeyPredicate):
+    """The attribute is a string starting with the prefix."""
+
+    def __init__(self, key: str, prefix: str):
+        super().__init__(key)
+        self.prefix = prefix
+
+    def matches(self, data_entity: "DataEntity") -> bool:
+        value = self.get_value(data_entity)
+        return isinstance(value, str) and value.startswith(self.prefix)
+
+
+class And(Predicate):
+    """All the predicates are fulfilled, it stops on the first failure."""
+
+    def __init__(self, *predicates: Predicate):
+        if not predicates:
+            raise ValueError(f"{type(self).__name__} needs a predicate.")
+        self.predicates = predicates
+
+    def matches(self, data_entity: "DataEntity") -> bool:
+        return all(
+            predicate.matches(data_entity) for predicate in self.predicates
+        )
+
+    def plan(self, data_entity_set: "DataEntitySet") -> Optional[Plan]:
+        plans = [
+            predicate.plan(data_entity_set) for predicate in self.predicates
+        ]
+        plans.append(self._plan_grouped_partition(data_entity_set))
+        available = [plan for plan in plans if plan is not None]
+        if not available:
+            return None
+        return min(available, key=lambda plan: plan[0])
+
+    def _plan_grouped_partition(
+        self, data_entity_set: "DataEntitySet"
+    ) -> Optional[Plan]:
+        """
+        Uses the grouped index narrowed to the partitions that match the
+        equalities over partition keys.
+        """
+        equalities: Dict[str, Any] = {
+            predicate.key: predicate.value
+            for predicate in self.predicates
+            if isinstance(predicate, Equals)
+        }
+        grouped_key = data_entity_set.grouped_key
+        if grouped_key is None or grouped_key not in equalities:
+            return None
+        partition_values = {
+            key: equalities[key]
+            for key in data_entity_set.partition_keys
+            if key in equalities
+        }
+        group = equalities[grouped_key]
+        return (
+            data_entity_set.count_grouped_entities(group, partition_values),
+            data_entity_set.get_grouped_entities(group, partition_values),
+        )
+
+
+class Or(Predicate):
+    """Any of the predicates is fulfilled, it stops on the first success."""
+
+    def __init__(self, *predicates: Predicate):
+        if not predicates:
+            raise ValueError(f"{type(self).__name__} needs a predicate.")
+        self.predicates = predicates
+
+    def matches(self, data_entity: "DataEntity") -> bool:
+        return any(
+            predicate.matches(data_entity) for predicate in self.predicates
+        )
+
+    def plan(self, data_entity_set: "DataEntitySet") -> Optional[Plan]:
+        plans = []
+        for predicate in self.predicates:
+            plan = predicate.plan(data_entity_set)
+            if plan is None:
+                return None
+            plans.append(plan)
+        return (
+            sum(plan[0] for plan in plans),
+            _unique(candidate for plan in plans for candidate in plan[1]),
+        )
+
+
+def _unique(data_entities: Iterable["DataEntity"]) -> Iterator["DataEntity"]:
+    """Yields each DataEntity only once."""
+    seen = set()
+    for data_entity in data_entities:
+        if data_entity not in seen:
+            seen.add(data_entity)
+            yield data_entity
+
+
+def where(**key_values: Any) -> Predicate:
+    """Returns the And of the equalities of each received attribute."""
+    if not key_values:
+        raise ValueError("where needs at least one attribute.")
+    return And(*(Equals(key, value) for key, value in key_values.items()))
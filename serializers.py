@@ -0,0 +1,151 @@
+import json
+import struct
+from array import array
+from typing import IO, Any, Dict, List, Sequence, Tuple
+
+from error_management.exceptions import FileError
+
+
+class Serializer:
+    """
+    Converts the list of dictionaries of a DataEntitySet dump to a file and
+    back. names is the fixed schema, the attribute names of the entity.
+    """
+
+    extension: str = ""
+    # True if the file is opened in binary mode.
+    binary: bool = False
+
+    def dump(
+        self, records: List[Dict], names: Sequence[str], file: IO
+    ) -> None:
+        raise NotImplementedError
+
+    def load(self, file: IO) -> List[Dict]:
+        raise NotImplementedError
+
+
+class JSONSerializer(Serializer):
+    """Pretty-printed JSON array, the export format."""
+
+    extension = ".JSON"
+    binary = False
+
+    def dump(
+        self, records: List[Dict], names: Sequence[str], file: IO
+    ) -> None:
+        json.dump(records, file, indent=4, sort_keys=True)
+
+    def load(self, file: IO) -> List[Dict]:
+        return json.load(file)
+
+
+class BinarySerializer(Serializer):
+    """
+    Compact column oriented snapshot. After the header each attribute of
+    the schema is stored as a column, decoded in bulk with array, split or
+    a JSON fallback instead of value by value.
+
+    Layout (little endian):
+        magic b"DES1", field count (H), record count (I)
+        per field: name length (H), name, column type (c),
+                   payload length (Q), payload
+    Column types:
+        b: booleans, one signed byte per record
+        q: integers, 8 bytes per record
+        d: floats, 8 bytes per record
+        s: strings joined with NUL and encoded as UTF-8
+        j: JSON array, for None and mixed values
+    """
+
+    extension = ".bin"
+    binary = True
+    magic = b"DES1"
+    separator = "\x00"
+
+    def dump(
+        self, records: List[Dict], names: Sequence[str], file: IO
+    ) -> None:
+        file.write(self.magic)
+        file.write(struct.pack("<HI", len(names), len(records)))
+        for name in names:
+            column_type, payload = self._encode_column(
+                [record.get(name) for record in records]
+            )
+            encoded_name = name.encode("utf-8")
+            file.write(struct.pack("<H", len(encoded_name)))
+            file.write(encoded_name)
+            file.write(column_type)
+            file.write(struct.pack("<Q", len(payload)))
+            file.write(payload)
+
+    def load(self, file: IO) -> List[Dict]:
+        if file.read(len(self.magic)) != self.magic:
+            raise FileError("The file is not a binary snapshot.")
+        field_count, record_count = self._unpack(file, "<HI")
+        names = []
+        columns = []
+        for _ in range(field_count):
+            (name_length,) = self._unpack(file, "<H")
+            names.append(file.read(name_length).decode("utf-8"))
+            column_type = file.read(1)
+            (payload_length,) = self._unpack(file, "<Q")
+            payload = file.read(payload_length)
+            if len(payload) != payload_length:
+                raise FileError("The binary snapshot is truncated.")
+            columns.append(
+                self._decode_column(column_type, payload, record_count)
+            )
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def _unpack(self, file: IO, layout: str) -> Tuple:
+        size = struct.calcsize(layout)
+        data = file.read(size)
+        if len(data) != size:
+            raise FileError("The binary snapshot is truncated.")
+        return struct.unpack(layout, data)
+
+    def _encode_column(self, values: List[Any]) -> Tuple[bytes, bytes]:
+        """Returns the column type and payload of the values."""
+        types = {type(value) for value in values}
+        if types == {bool}:
+            return b"b", array("b", values).tobytes()
+        if types == {int}:
+            return b"q", array("q", values).tobytes()
+        if types == {float}:
+            return b"d", array("d", values).tobytes()
+        if types == {str} and not any(self.separator in v for v in values):
+            return b"s", self.separator.join(values).encode("utf-8")
+        return b"j", json.dumps(values).encode("utf-8")
+
+    def _decode_column(
+        self, column_type: bytes, payload: bytes, record_count: int
+    ) -> List[Any]:
+        """Returns the values of the column payload."""
+        if record_count == 0:
+            return []
+        if column_type == b"b":
+            return list(map(bool, array("b", payload)))
+        if column_type in (b"q", b"d"):
+            values = array(column_type.decode())
+            values.frombytes(payload)
+            return values.tolist()
+        if column_type == b"s":
+            return payload.decode("utf-8").split(self.separator)
+        if column_type == b"j":
+            return json.loads(payload)
+        raise FileError(f"Unknown column type {column_type!r}.")
+
+
+SERIALIZERS: Dict[str, Serializer] = {
+    "json": JSONSerializer(),
+    "binary": BinarySerializer(),
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    """Returns the serializer registered with the name."""
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise FileError(f"Snapshot format '{name}' is not defined.")
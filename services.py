@@ -1,11 +1,34 @@
+import json
+from datetime import datetime, timezone
+from typing import Optional, Set, Tuple
+
 import data_management
-from constants import TASK_STATUSES, SESSION_TIME
+from constants import DATETIME_FORMAT, TASK_STATUSES, SESSION_TIME
+from error_management.exceptions import (
+    FileError,
+    InputError,
+    PasswordAuthenticationError,
+)
+from models import Task, User
 from session_management import (
+    close_token_session,
+    create_token_session,
     get_session_user,
     save_session,
     set_defatult_session_value,
 )
-from utils import validate_user_not_exists, hash_word, verify_hashed_word
+from utils import (
+    forget_verified_words,
+    hash_word,
+    hash_word_async,
+    is_valid_not_existing_name,
+    is_valid_pass,
+    remember_verified_word,
+    validate_user_not_exists,
+    verify_hashed_word,
+    verify_hashed_word_async,
+    word_needs_rehash,
+)
 
 
 state = data_management.get_persistent_data()
@@ -14,58 +37,209 @@ state = data_management.get_persistent_data()
 # ////// User Functions \\\\\\ #
 
 
-def create_new_user(name: str, password: str) -> None:
-    """Gets name and password and creates a new user."""
-    hashed_password = hash_word(password)
+def create_new_user(
+    name: str, password: str, hashed_password: Optional[str] = None
+) -> bool:
+    """
+    Gets name and password and creates a new user. The hashed_password \
+    can be made before with hash_word_async, so it isn't hashed here.
+    """
+    # The password is hashed in the pool while the name is validated.
+    hashing = hash_word_async(password) if hashed_password is None else None
+    if not validate_user_not_exists(name):
+        if hashing is not None:
+            hashing.cancel()
+        print("The username already exists.")
+        return False
+    if hashing is not None:
+        hashed_password = hashing.result()
+    if not hashed_password:
+        raise PasswordAuthenticationError("The password wasn't hashed.")
     data = {"name": name, "password": hashed_password}
-    if validate_user_not_exists(name):
-        state["userset"].add_jSON(data)
-    login(name, password)
+    state["userset"].add_jSON(data)
+    user = state["userset"].get_user_by_name(name)
+    remember_verified_word(user.get_user_uuid(), password, data["password"])
+    # It was just hashed from the password, so it's known to match.
+    return login(name, password, (data["password"], True))
+
+
+def import_users(file_path: str) -> None:
+    """
+    Creates the users of a JSON file with a list of names and passwords, \
+    their passwords are hashed in parallel.
+    """
+    try:
+        with open(file_path, "r") as file:
+            users_data = json.load(file)
+        if not isinstance(users_data, list):
+            raise InputError("The users file should have a JSON list.")
+    except (OSError, json.JSONDecodeError, InputError) as e:
+        print(f"The users file couldn't be read: {e}")
+        return
+    hashings = {}
+    skipped = 0
+    for data in users_data:
+        name = data.get("name", "") if isinstance(data, dict) else ""
+        password = data.get("password", "") if isinstance(data, dict) else ""
+        if (
+            name in hashings
+            or not is_valid_not_existing_name(name)
+            or not is_valid_pass(password)
+        ):
+            skipped += 1
+            continue
+        hashings[name] = hash_word_async(password)
+    # Every password is hashed before a user is stored, so a failed one
+    # doesn't leave the import half done.
+    hashed_passwords = {
+        name: hashing.result() for name, hashing in hashings.items()
+    }
+    for name, hashed_password in hashed_passwords.items():
+        if not hashed_password:
+            raise PasswordAuthenticationError(
+                f"The password of {name} wasn't hashed."
+            )
+    for name, hashed_password in hashed_passwords.items():
+        state["userset"].add_jSON({"name": name, "password": hashed_password})
+    print(f"{len(hashings)} users imported, {skipped} skipped.")
 
 
-def login(username: str, password: str) -> None:
-    """Gets name and password and updates the session with the user."""
+def authenticate(
+    username: str,
+    password: str,
+    verification: Optional[Tuple[str, bool]] = None,
+    rehashed_password: Optional[str] = None,
+) -> Optional[User]:
+    """
+    Returns the user if the password is correct, rehashing it when the \
+    argon2 parameters changed. Otherwise prints why and returns None.
+    The verification is the stored hash and the result of verifying the \
+    password against it in the hashing pool, and rehashed_password its \
+    new hash, so a caller can keep argon2 out of this thread.
+    """
     user = state["userset"].get_user_by_name(username)
     if user is not None:
         stored_password = user.get_data()["password"]
-        if verify_hashed_word(password, stored_password):
-            save_session(user)
-            print(
-                f'Logged as "{username}", the session will expire in {SESSION_TIME} minutes.'
-            )
+        if verification is not None:
+            # It changed since it was verified, so it's taken as wrong.
+            verified_password, is_correct = verification
+            is_correct = is_correct and verified_password == stored_password
+        else:
+            is_correct = verify_hashed_word_async(
+                password, stored_password, user.get_user_uuid()
+            ).result()
+        if is_correct:
+            if word_needs_rehash(stored_password):
+                rehash_password(user, password, rehashed_password)
+            return user
         else:
             print("The password is not correct.")
     else:
         print("The username doesn't exist.")
+    return None
+
+
+def login(
+    username: str,
+    password: str,
+    verification: Optional[Tuple[str, bool]] = None,
+    rehashed_password: Optional[str] = None,
+) -> bool:
+    """
+    Gets name and password and updates the session with the user, \
+    returns True if the user was logged in. The verification and the \
+    rehashed_password are the ones of authenticate.
+    """
+    user = authenticate(username, password, verification, rehashed_password)
+    if user is None:
+        return False
+    save_session(user)
+    print(
+        f'Logged as "{username}", the session will expire in {SESSION_TIME} minutes.'
+    )
+    return True
+
 
+def login_with_token(username: str, password: str) -> Optional[str]:
+    """
+    Starts a token session of the user, apart from the current session, \
+    prints and returns its token. None if the login failed.
+    """
+    user = authenticate(username, password)
+    if user is None:
+        return None
+    token = create_token_session(user)
+    print(token)
+    return token
 
-def logout() -> None:
-    """Restores the current user to None and closes the session."""
-    set_defatult_session_value()
+
+def rehash_password(
+    user: User, password: str, hashed_password: Optional[str] = None
+) -> None:
+    """
+    Replaces the stored hash of the verified password with one made with \
+    the configured argon2 profile, or with hashed_password if it's made.
+    """
+    if hashed_password is None:
+        hashed_password = hash_word(password)
+    if not hashed_password:
+        return
+    datetime_now = datetime.now(timezone.utc).strftime(DATETIME_FORMAT)
+    user.udpate(
+        {"password": hashed_password, "update_datetime": datetime_now}
+    )
+    remember_verified_word(user.get_user_uuid(), password, hashed_password)
+
+
+def change_password(password: str, new_password: str) -> None:
+    """Replaces the password of the current user if password is correct."""
+    user = get_session_user()
+    stored_password = user.get_data()["password"]
+    if not verify_hashed_word(password, stored_password):
+        print("The password is not correct.")
+        return
+    datetime_now = datetime.now(timezone.utc).strftime(DATETIME_FORMAT)
+    user.udpate(
+        {"password": hash_word(new_password), "update_datetime": datetime_now}
+    )
+    forget_verified_words(user.get_user_uuid())
+    print("Password changed.")
+
+
+def logout(session_token: Optional[str] = None) -> None:
+    """
+    Restores the current user to None and closes the session, or closes \
+    the token session if there's a session_token.
+    """
+    if session_token is not None:
+        if not close_token_session(session_token):
+            print("The session token is not valid or it expired.")
+            return
+    else:
+        set_defatult_session_value()
     print("User Logout.")
 
 
 # ////// Task Functions \\\\\\ #
 
 
-def list_user_tasks() -> None:
-    """Prints all the tasks created by the current user."""
+def list_user_tasks() -> Set[Task]:
+    """Prints and returns all the tasks created by the current user."""
     user_uuid = get_session_user().get_user_uuid()
-    user_tasks = state["taskset"].get_user_tasks(user_uuid)
+    with data_management.get_task_reader() as task_reader:
+        user_tasks = task_reader.get_user_tasks(user_uuid)
     [print(task) for task in user_tasks]
+    return user_tasks
 
 
-def create_task(title: str, description: str) -> None:
-    """Creates and prints a task related to the current user."""
+def create_task(title: str, description: str) -> Task:
+    """Creates, prints and returns a task related to the current user."""
     user_uuid = get_session_user().get_user_uuid()
-    data = {
-        "title": title,
-        "description": description,
-        "owner_uuid": user_uuid,
-    }
-    state["taskset"].add_jSON(data)
-    task = state["taskset"].get_last_user_created_task()
+    # Built here so it's this task even if others are created meanwhile.
+    task = Task(title, description, user_uuid)
+    state["taskset"].add(task)
     print(task)
+    return task
 
 
 def edit_task(
@@ -87,3 +261,22 @@ def edit_task(
 def delete_task(task_uuid: str) -> None:
     """Gets task UUID and deletes the task."""
     state["taskset"].delete_task(task_uuid)
+
+
+def export_data(folder: Optional[str] = None) -> bool:
+    """Exports every set into a JSON file in the folder or FILEPATH."""
+    written = data_management.data_exporting(folder)
+    if len(written) < len(data_management.get_sets_and_object()):
+        print("The data was not exported, see the log.")
+        return False
+    print(f"Data exported into {', '.join(written)}.")
+    return True
+
+
+def migrate_tasks_to_shards() -> None:
+    """Splits the tasks file into one file per owner UUID prefix."""
+    try:
+        written = data_management.migrate_task_shards()
+        print(f"Tasks migrated into {len(written)} shards.")
+    except FileError as fe:
+        print(f"The tasks were not migrated: {fe}")
@@ -1,11 +1,20 @@
+import contextlib
+import heapq
+import json
+import time
+from contextvars import ContextVar
 from datetime import datetime, timezone, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple, cast
 
 import data_management
+from config import FILEPATH
 from constants import (
     CURRENT_USER_PATH,
     DATETIME_FORMAT,
     OPERATIONS,
+    SESSIONS_PATH,
     SESSION_TIME,
+    SESSION_TOKEN_BYTES,
 )
 from error_management.exceptions import SessionError
 from logging_utils import get_logger
@@ -16,53 +25,194 @@ logger = get_logger(__name__)
 state = data_management.get_persistent_data()
 
 
+def get_expiry_instant(loged_in_datetime: str) -> float:
+    """
+    Returns the monotonic clock instant when a session started at the \
+    datetime expires.
+    """
+    logged_in_dt = datetime.strptime(
+        loged_in_datetime, DATETIME_FORMAT
+    ).replace(tzinfo=timezone.utc)
+    remaining = (
+        logged_in_dt
+        + timedelta(minutes=SESSION_TIME)
+        - datetime.now(timezone.utc)
+    )
+    return time.monotonic() + remaining.total_seconds()
+
+
+class Session:
+    """
+    Logged in user of a session, with the direct User reference and the \
+    expiry instant on the monotonic clock, computed once at login or load.
+    """
+
+    __slots__ = ("user", "loged_in_datetime", "expires_at")
+    user: Optional[User]
+    loged_in_datetime: Optional[str]
+    expires_at: float
+
+    def __init__(self) -> None:
+        self.clear()
+
+    def start(self, user: User, loged_in_datetime: str) -> None:
+        """Sets the user, its login datetime and the expiry instant."""
+        self.user = user
+        self.loged_in_datetime = loged_in_datetime
+        self.expires_at = get_expiry_instant(loged_in_datetime)
+
+    def clear(self) -> None:
+        """Removes the user of the session."""
+        self.user = None
+        self.loged_in_datetime = None
+        self.expires_at = 0.0
+
+    def is_expired(self) -> bool:
+        """Returns True if there's no user or its time is over."""
+        return self.user is None or time.monotonic() >= self.expires_at
+
+    def get_data(self) -> Dict:
+        """Returns the session as it's stored in the file."""
+        if self.user is None:
+            return {"name": None, "user_uuid": None, "loged_in_datetime": None}
+        return {
+            "name": self.user.get_user_name(),
+            "user_uuid": self.user.get_user_uuid(),
+            "loged_in_datetime": self.loged_in_datetime,
+        }
+
+
+class SessionStore:
+    """
+    Sessions of many users at once, by random token. The expired ones \
+    are evicted lazily, from a min-heap of the expiry instants, when the \
+    store is used.
+    """
+
+    def __init__(self) -> None:
+        self.sessions: Dict[str, Session] = {}
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def add(self, token: str, user: User, loged_in_datetime: str) -> None:
+        """Adds the session of the user with the token."""
+        session = Session()
+        session.start(user, loged_in_datetime)
+        self.sessions[token] = session
+        heapq.heappush(self.expiry_heap, (session.expires_at, token))
+        self.dirty = True
+
+    def create(self, user: User) -> str:
+        """Starts a session of the user now and returns its token."""
+        import secrets
+
+        token = secrets.token_urlsafe(SESSION_TOKEN_BYTES)
+        datetime_now = datetime.now(timezone.utc).strftime(DATETIME_FORMAT)
+        self.add(token, user, datetime_now)
+        return token
+
+    def get(self, token: str) -> Optional[Session]:
+        """Returns the session of the token, None if it expired."""
+        self.evict_expired()
+        return self.sessions.get(token)
+
+    def remove(self, token: str) -> bool:
+        """
+        Closes the session of the token, returns False if it didn't \
+        exist. Its heap entry is dropped when it expires.
+        """
+        if self.sessions.pop(token, None) is None:
+            return False
+        self.dirty = True
+        return True
+
+    def evict_expired(self) -> int:
+        """Removes the expired sessions and returns how many were removed."""
+        now = time.monotonic()
+        evicted = 0
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            _, token = heapq.heappop(self.expiry_heap)
+            if self.sessions.pop(token, None) is not None:
+                evicted += 1
+        if evicted:
+            self.dirty = True
+        return evicted
+
+    def dump(self) -> Dict[str, List]:
+        """Returns the sessions as {token: [user_uuid, login timestamp]}."""
+        self.evict_expired()
+        return {
+            token: [
+                session.user.get_user_uuid(),
+                int(
+                    datetime.strptime(
+                        session.loged_in_datetime, DATETIME_FORMAT
+                    )
+                    .replace(tzinfo=timezone.utc)
+                    .timestamp()
+                ),
+            ]
+            for token, session in self.sessions.items()
+            if session.user is not None
+            and session.loged_in_datetime is not None
+        }
+
+
+# The CLI session, stored in the file. The API server sets one per
+# connection as the session of the running request.
+state["current_user"] = Session()
+current_session: ContextVar[Optional[Session]] = ContextVar(
+    "current_session", default=None
+)
+# Last session data read from or written to the file.
+stored_session_data: Optional[Dict] = None
+
+
+def get_current_session() -> Session:
+    """Returns the session of the running request or the CLI one."""
+    session = current_session.get()
+    return session if session is not None else state["current_user"]
+
+
 def verify_session_time_expired(loged_in_datetime: str) -> bool:
-    print(" ******* verify_session_time_expired called")
     """Verifies if the session time is expired."""
-    current_time = datetime.now(timezone.utc)
-    print(f" ******* loged_in_datetime: {loged_in_datetime}")
-    if loged_in_datetime is not None:
-        logged_in_dt = datetime.strptime(
-            loged_in_datetime,
-            DATETIME_FORMAT,
-        ).replace(tzinfo=timezone.utc)
-        expiration_time = logged_in_dt + timedelta(minutes=SESSION_TIME)
-        print(f" ******* expiration_time: {expiration_time}")
-        if current_time < expiration_time:
-            print(" ******* returning False")
-            return False
-    print(" ******* returning True")
-    return True
+    if loged_in_datetime is None:
+        return True
+    return time.monotonic() >= get_expiry_instant(loged_in_datetime)
 
 
 def verify_session_expired() -> bool:
     """Verifies if the current user session is expired."""
-    print(" ******* verify_session_expired called")
-    print(f" ******* state['current_user']: {state['current_user']}")
-    print(
-        f" ******* state['current_user']['user']: {state['current_user']['user']}"
-    )
-    if state["current_user"]["user"] is None:
-        print(
-            f" ******* state['current_user']['user']: {state['current_user']['user']}"
-        )
-        return True
-    if state["current_user"]["loged_in_datetime"] is None:
-        print(
-            f" ******* state['current_user']['loged_in_datetime']: {state['current_user']['loged_in_datetime']}"
-        )
-        return True
-    return verify_session_time_expired(
-        state["current_user"]["loged_in_datetime"]
+    return get_current_session().is_expired()
+
+
+def store_session() -> None:
+    """Writes the CLI session in the file, if it changed since last time."""
+    global stored_session_data
+    if current_session.get() is not None:
+        # Only the CLI session is stored in the file.
+        return
+    data = state["current_user"].get_data()
+    if data == stored_session_data:
+        return
+    data_management.data_object_loading(
+        CURRENT_USER_PATH, OPERATIONS["writing"], data
     )
+    stored_session_data = data
+    logger.info("Session saved.")
 
 
 def load_session() -> None:
     """Loads the current user session data."""
+    global stored_session_data
     try:
         current_user_data = data_management.data_object_loading(
             CURRENT_USER_PATH, OPERATIONS["reading"]
         )
+        stored_session_data = current_user_data
         expired = verify_session_time_expired(
             current_user_data["loged_in_datetime"]
         )
@@ -70,12 +220,10 @@ def load_session() -> None:
             current_user = state["userset"].get_user_by_uuid(
                 current_user_data["user_uuid"]
             )
-            state["current_user"] = {
-                "user": current_user,
-                "loged_in_datetime": current_user_data["loged_in_datetime"],
-            }
-            print(" ******* state['current_user']: ", state["current_user"])
-
+            if current_user is not None:
+                state["current_user"].start(
+                    current_user, current_user_data["loged_in_datetime"]
+                )
         else:
             logger.info("Previous session expired.")
         logger.info("Session loaded.")
@@ -87,42 +235,132 @@ def save_session(user: User) -> None:
     """Storages the current user session data."""
     try:
         datetime_now = datetime.now(timezone.utc).strftime(DATETIME_FORMAT)
-        state["current_user"]["user"] = user
-        state["current_user"]["loged_in_datetime"] = datetime_now
-        print(" ******* datetime_now: ", datetime_now)
-        print(" ******* user.get_user_name(): ", user.get_user_name())
-        data = {
-            "name": user.get_user_name(),
-            "user_uuid": user.get_user_uuid(),
-            "loged_in_datetime": datetime_now,
-        }
-        data_management.data_object_loading(
-            CURRENT_USER_PATH, OPERATIONS["writing"], data
-        )
-        logger.info("Session saved.")
+        get_current_session().start(user, datetime_now)
+        store_session()
     except Exception as e:
         logger.error(f"save_session: Error: {e}")
 
 
 def set_defatult_session_value() -> None:
     """Sets the default value for the current user session."""
-    state["current_user"] = {"user": None, "loged_in_datetime": None}
+    try:
+        get_current_session().clear()
+        store_session()
+    except Exception as e:
+        logger.error(f"set_defatult_session_value: Error: {e}")
 
 
 def get_session_user() -> User:
     """Returns the current user object."""
-    return state["current_user"]["user"]
+    # The commands check the session is alive before reading its user.
+    return cast(User, get_current_session().user)
+
+
+def get_sessions_path() -> str:
+    """Returns the path of the session store file."""
+    return str(FILEPATH) + SESSIONS_PATH
+
+
+def load_session_store() -> SessionStore:
+    """Returns the SessionStore with the not expired stored sessions."""
+    store = SessionStore()
+    try:
+        with open(get_sessions_path(), "r") as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return store
+    except Exception as e:
+        logger.error(f"load_session_store: Error: {e}")
+        return store
+    if not isinstance(data, dict):
+        logger.error("load_session_store: Error: The sessions aren't a dict.")
+        return store
+    for token, session_data in data.items():
+        try:
+            user_uuid, timestamp = session_data
+            user = state["userset"].get_user_by_uuid(user_uuid)
+            loged_in_datetime = datetime.fromtimestamp(
+                timestamp, timezone.utc
+            ).strftime(DATETIME_FORMAT)
+        except Exception as e:
+            logger.warning(
+                f"load_session_store: Skipped a malformed session: {e}"
+            )
+            continue
+        if user is None:
+            continue
+        if not verify_session_time_expired(loged_in_datetime):
+            store.add(token, user, loged_in_datetime)
+    store.dirty = len(store) != len(data)
+    return store
+
+
+state.register_loader("sessionstore", load_session_store)
+
+
+def save_session_store() -> None:
+    """Writes the session store in compact JSON, if it changed."""
+    if not state.is_loaded("sessionstore"):
+        return
+    store: SessionStore = state["sessionstore"]
+    data = store.dump()
+    if not store.dirty:
+        return
+    try:
+        data_management.atomic_write(
+            get_sessions_path(),
+            lambda file: json.dump(data, file, separators=(",", ":")),
+        )
+        store.dirty = False
+        logger.info("Session store saved.")
+    except Exception as e:
+        logger.error(f"save_session_store: Error: {e}")
+
+
+def create_token_session(user: User) -> str:
+    """Starts a stored session of the user and returns its token."""
+    token = state["sessionstore"].create(user)
+    save_session_store()
+    return token
+
+
+def close_token_session(token: str) -> bool:
+    """Closes the stored session of the token, False if it didn't exist."""
+    closed = state["sessionstore"].remove(token)
+    save_session_store()
+    return closed
+
+
+@contextlib.contextmanager
+def use_session_token(token: str) -> Iterator[Session]:
+    """
+    Makes the stored session of the token the current session inside \
+    the block. Raises a SessionError if it doesn't exist or expired.
+    """
+    session = state["sessionstore"].get(token)
+    if session is None:
+        raise SessionError("The session token is not valid or it expired.")
+    reset_token = current_session.set(session)
+    try:
+        yield session
+    finally:
+        current_session.reset(reset_token)
 
 
 def verify_current_user(func):
     """
     Decorator to verify if there is a user currently loged.
     If there's not current session it doesn't execute the function.
+    With a session_token keyword argument, the stored session of the
+    token is used instead of the current one.
     """
 
-    def wrapper(*args, **kwargs):
+    def wrapper(*args, session_token: Optional[str] = None, **kwargs):
         try:
-            if not verify_session_expired():
+            if session_token is not None:
+                with use_session_token(session_token):
+                    func(*args, **kwargs)
+            elif not verify_session_expired():
                 func(*args, **kwargs)
             else:
                 raise SessionError(
@@ -0,0 +1,231 @@
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from error_management.exception_utils import data_object_exception_manager
+from error_management.exceptions import TaskSetError
+from models import DataEntity, Task, TaskSet, mutation_lock
+
+
+def get_shard_key(owner_uuid: str, prefix_length: int) -> str:
+    """Returns the shard of the owner, the first characters of its UUID."""
+    return owner_uuid[:prefix_length].lower()
+
+
+class ShardedTaskSet(TaskSet):
+    """
+    TaskSet stored in one file per owner_uuid prefix. A shard is loaded
+    before its owners' tasks are read or added, the rest are loaded only
+    when a searched task isn't in the loaded ones. It keeps the changed
+    shards so only their files are written.
+    """
+
+    def __init__(
+        self,
+        shard_loader: Callable[[str], Optional[Iterable[Dict]]],
+        shard_keys: Iterable[str],
+        prefix_length: int,
+        executor: Optional[Executor] = None,
+    ):
+        self.shard_loader = shard_loader
+        self.prefix_length = prefix_length
+        # Pool that reads the shards in parallel when all are loaded.
+        self.executor = executor
+        self._unloaded_shards: Set[str] = set(shard_keys)
+        self._loaded_shards: Set[str] = set()
+        self._dirty_shards: Set[str] = set()
+        # Updates of tasks in shards that weren't loaded: shard -> changes.
+        self._pending_updates: Dict[str, List[Tuple[str, Dict]]] = {}
+        super().__init__()
+
+    def get_shard_key(self, owner_uuid: str) -> str:
+        """Returns the shard that stores the tasks of the owner."""
+        return get_shard_key(owner_uuid, self.prefix_length)
+
+    def get_loaded_shards(self) -> Set[str]:
+        """Returns the shards read from their files."""
+        return set(self._loaded_shards)
+
+    @data_object_exception_manager
+    def load_shard(self, shard: str) -> List[Task]:
+        """
+        Reads the tasks of the shard into the set, once, and returns \
+        them. They are stored already, so they aren't dirty or notified.
+        """
+        if shard in self._loaded_shards:
+            return []
+        # A shard that isn't stored yet has no file to read.
+        stored = shard in self._unloaded_shards
+        return self._add_shard_data(
+            shard, self.shard_loader(shard) if stored else None
+        )
+
+    def _add_shard_data(
+        self, shard: str, shard_data: Optional[Iterable[Dict]]
+    ) -> List[Task]:
+        """
+        Adds the read tasks of the shard as stored ones, then applies the \
+        updates of the shard that were waiting for it.
+        """
+        tasks = []
+        for data in shard_data or []:
+            attributes: Dict[str, Any] = {
+                attr[1:]: data.get(attr[1:], None)
+                for attr in self.related_class.get_attribute_names()
+            }
+            tasks.append(self.related_class(**attributes))
+        with mutation_lock:
+            self._loaded_shards.add(shard)
+            self._unloaded_shards.discard(shard)
+            for task in tasks:
+                set.add(self, task)
+                self.index_data_entity(task)
+                task.attach_data_entity_set(self)
+            for uuid, data in self._pending_updates.pop(shard, []):
+                task = self.get_loaded_data_entity(uuid)
+                if task is not None:
+                    task.udpate(data)
+        return tasks
+
+    @data_object_exception_manager
+    def load_all_shards(self) -> None:
+        """
+        Reads every stored shard that isn't loaded yet, in the executor \
+        if there's one.
+        """
+        shards = sorted(self._unloaded_shards)
+        if self.executor is None:
+            for shard in shards:
+                self.load_shard(shard)
+            return
+        for shard, shard_data in zip(
+            shards, self.executor.map(self.shard_loader, shards)
+        ):
+            self._add_shard_data(shard, shard_data)
+
+    @data_object_exception_manager
+    def add(self, data_entity: DataEntity) -> None:
+        """Loads the shard of the owner and adds the Task to it."""
+        if isinstance(data_entity, self.related_class):
+            shard = self.get_shard_key(data_entity.get_value("owner_uuid"))
+            self.load_shard(shard)
+            with mutation_lock:
+                is_new = data_entity not in self
+                super().add(data_entity)
+                if is_new:
+                    self._dirty_shards.add(shard)
+        else:
+            super().add(data_entity)
+
+    @data_object_exception_manager
+    def entity_updated(
+        self, data_entity: DataEntity, previous_values: Dict
+    ) -> None:
+        """Flags the shard of the Task, and its previous one, as changed."""
+        super().entity_updated(data_entity, previous_values)
+        self._dirty_shards.add(
+            self.get_shard_key(data_entity.get_value("owner_uuid"))
+        )
+        if "owner_uuid" in previous_values:
+            self._dirty_shards.add(
+                self.get_shard_key(previous_values["owner_uuid"])
+            )
+
+    @data_object_exception_manager
+    def get_data_entity_by_key(
+        self, key: str, value: Any
+    ) -> Optional[DataEntity]:
+        """
+        Returns the Task with the key value from the loaded shards, \
+        loading the others one by one until it's found.
+        """
+        data_entity = super().get_data_entity_by_key(key, value)
+        while data_entity is None and self._unloaded_shards:
+            tasks = self.load_shard(min(self._unloaded_shards))
+            if self.has_index(key):
+                data_entity = self._indexes[key].get(value)
+            else:
+                data_entity = next(
+                    (task for task in tasks if task.get_value(key) == value),
+                    None,
+                )
+        return data_entity
+
+    @data_object_exception_manager
+    def get_loaded_data_entity(self, uuid: str) -> Optional[DataEntity]:
+        """Returns the Task with the UUID only from the loaded shards."""
+        return super().get_data_entity_by_key(self.get_uuid_key(), uuid)
+
+    @data_object_exception_manager
+    def update_stored(self, owner_uuid: str, uuid: str, data: Dict) -> None:
+        """
+        Updates the Task of the owner if its shard is loaded, else keeps \
+        the update until the shard is loaded.
+        """
+        shard = self.get_shard_key(owner_uuid)
+        with mutation_lock:
+            if shard not in self._loaded_shards:
+                self._pending_updates.setdefault(shard, []).append(
+                    (uuid, data)
+                )
+                return
+        task = self.get_loaded_data_entity(uuid)
+        if task is not None:
+            task.udpate(data)
+
+    def get_pending_shards(self) -> Set[str]:
+        """Returns the shards with updates waiting for them to be loaded."""
+        return set(self._pending_updates)
+
+    def get_user_tasks(
+        self,
+        owner_uuid: str,
+        filter_status: Optional[str] = None,
+        inclue_delete: bool = False,
+    ) -> Set:
+        """Loads the shard of the User and returns its tasks."""
+        try:
+            self.load_shard(self.get_shard_key(owner_uuid))
+            return super().get_user_tasks(
+                owner_uuid, filter_status, inclue_delete
+            )
+        except Exception as e:
+            raise TaskSetError(f"TaskSet: in getUserTasks: {e}")
+
+    def get_dirty_shards(self) -> Set[str]:
+        """Returns the shards changed since they were stored."""
+        return set(self._dirty_shards)
+
+    @data_object_exception_manager
+    def dump_shard(self, shard: str) -> List[Dict]:
+        """Returns the data of the loaded tasks of the shard."""
+        return [
+            task.get_data()
+            for owner_uuid, buckets in self._group_index.items()
+            if self.get_shard_key(owner_uuid) == shard
+            for bucket in buckets.values()
+            for task in bucket
+        ]
+
+    @data_object_exception_manager
+    def dump(self) -> List[Dict]:
+        """Loads every shard and returns the data of all the tasks."""
+        self.load_all_shards()
+        return super().dump()
+
+    @data_object_exception_manager
+    def mark_clean(self) -> None:
+        """Flags the set, its dirty items and its shards as stored."""
+        super().mark_clean()
+        self._dirty_shards = set()
+
+    @data_object_exception_manager
+    def mark_shards_clean(self, shards: Iterable[str]) -> None:
+        """Flags only the shards and their dirty items as stored."""
+        shards = set(shards)
+        with mutation_lock:
+            for task in list(self._dirty_entities):
+                owner_uuid = task.get_value("owner_uuid")
+                if self.get_shard_key(owner_uuid) in shards:
+                    task.mark_clean()
+                    self._dirty_entities.discard(task)
+            self._dirty_shards -= shards
@@ -0,0 +1,256 @@
+import sqlite3
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    cast,
+)
+
+from error_management.exception_utils import data_object_exception_manager
+from error_management.exceptions import TaskSetError
+from models import (
+    DataEntity,
+    DataEntitySet,
+    Task,
+    TaskSet,
+    UserSet,
+    mutation_lock,
+)
+from queries import Predicate
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        user_uuid TEXT PRIMARY KEY,
+        name TEXT NOT NULL,
+        password TEXT NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        creation_datetime TEXT,
+        update_datetime TEXT
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_name ON users (name)",
+    """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_uuid TEXT PRIMARY KEY,
+        owner_uuid TEXT NOT NULL,
+        title TEXT,
+        description TEXT,
+        status TEXT,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        creation_datetime TEXT,
+        update_datetime TEXT
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS tasks_owner
+    ON tasks (owner_uuid, deleted, status)
+    """,
+    "CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)",
+)
+
+
+def open_connection(path: str) -> sqlite3.Connection:
+    """Opens the database in WAL mode and creates the schema."""
+    connection = sqlite3.connect(
+        path, check_same_thread=False, cached_statements=256
+    )
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        connection.execute(statement)
+    connection.commit()
+    return connection
+
+
+if TYPE_CHECKING:
+    # The checker sees the DataEntitySet the mixin is combined with.
+    MixinBase = DataEntitySet
+else:
+    MixinBase = object
+
+
+class SQLiteDataEntitySet(MixinBase):
+    """
+    Mixin for DataEntitySet children stored in a SQLite table. The table is
+    the source of truth: changes are written through and reads are pushed
+    down as SQL. Only the read items are kept in the set, one object per
+    row, so the indexes of the set work as an identity map.
+    """
+
+    table: str = ""
+    boolean_keys: Sequence[str] = ("deleted",)
+
+    def __init__(self, connection: sqlite3.Connection):
+        self.connection = connection
+        self._columns: List[str] = [
+            name[1:] for name in self.related_class.get_attribute_names()
+        ]
+        self._select = f"SELECT {', '.join(self._columns)} FROM {self.table}"
+        self._insert = (
+            f"INSERT INTO {self.table} ({', '.join(self._columns)}) "
+            f"VALUES ({', '.join('?' for _ in self._columns)})"
+        )
+        super().__init__()
+
+    def __iter__(self) -> Iterator[DataEntity]:
+        for row in self.connection.execute(self._select):
+            yield self._materialize(row)
+
+    def __len__(self) -> int:
+        query = f"SELECT COUNT(*) FROM {self.table}"
+        return self.connection.execute(query).fetchone()[0]
+
+    def _to_row(self, data_entity: DataEntity) -> List[Any]:
+        return [data_entity.get_value(key) for key in self._columns]
+
+    def _to_data(self, row: Sequence[Any]) -> Dict:
+        data = dict(zip(self._columns, row))
+        for key in self.boolean_keys:
+            if key in data:
+                data[key] = bool(data[key])
+        return data
+
+    def _materialize(self, row: Sequence[Any]) -> DataEntity:
+        """Returns the object of the row, creating it the first time."""
+        data = self._to_data(row)
+        uuid_key = self.get_uuid_key()
+        data_entity = self._indexes[uuid_key].get(data[uuid_key])
+        if data_entity is None:
+            data_entity = self.related_class(**data)
+            set.add(self, data_entity)
+            self.index_data_entity(data_entity)
+            data_entity.attach_data_entity_set(self)
+        return data_entity
+
+    @data_object_exception_manager
+    def add(self, data_entity: DataEntity) -> None:
+        """
+        Inserts the row of the DataEntity and then adds it to the set, so \
+        the set isn't changed if the row can't be inserted.
+        """
+        with mutation_lock:
+            if isinstance(
+                data_entity, self.related_class
+            ) and not set.__contains__(self, data_entity):
+                self.connection.execute(
+                    self._insert, self._to_row(data_entity)
+                )
+            super().add(data_entity)
+
+    @data_object_exception_manager
+    def add_rows(self, json_list: List[Dict]) -> None:
+        """Inserts many items at once without keeping them in the set."""
+        self.connection.executemany(
+            self._insert,
+            ([data.get(key) for key in self._columns] for data in json_list),
+        )
+
+    @data_object_exception_manager
+    def entity_updated(
+        self, data_entity: DataEntity, previous_values: Dict
+    ) -> None:
+        """Writes the updated attributes to the row of the DataEntity."""
+        super().entity_updated(data_entity, previous_values)
+        uuid_key = self.get_uuid_key()
+        keys = list(previous_values.keys())
+        assignments = ", ".join(f"{key} = ?" for key in keys)
+        self.connection.execute(
+            f"UPDATE {self.table} SET {assignments} WHERE {uuid_key} = ?",
+            [data_entity.get_value(key) for key in keys]
+            + [previous_values.get(uuid_key, data_entity.get_value(uuid_key))],
+        )
+
+    @data_object_exception_manager
+    def get_data_entity_by_key(
+        self, key: str, value: Any
+    ) -> Optional[DataEntity]:
+        """
+        Returns the item with the key value, from the set if it was \
+        already read, else from the table.
+        """
+        if key not in self._columns:
+            raise AttributeError(f"attribute _{key}")
+        if self.has_index(key):
+            data_entity = self._indexes[key].get(value)
+            if data_entity is not None:
+                return data_entity
+        row = self.connection.execute(
+            f"{self._select} WHERE {key} = ? LIMIT 1", (value,)
+        ).fetchone()
+        return None if row is None else self._materialize(row)
+
+    @data_object_exception_manager
+    def query(self, predicate: Predicate) -> Iterator[DataEntity]:
+        """Returns a lazy iterator over the rows that fulfill predicate."""
+        return (
+            data_entity
+            for data_entity in self
+            if predicate.matches(data_entity)
+        )
+
+    @data_object_exception_manager
+    def dump(self) -> List[Dict]:
+        """Returns the data of every row."""
+        return [
+            self._to_data(row) for row in self.connection.execute(self._select)
+        ]
+
+
+class SQLiteUserSet(SQLiteDataEntitySet, UserSet):
+    """UserSet stored in the users table."""
+
+    table = "users"
+
+
+class SQLiteTaskSet(SQLiteDataEntitySet, TaskSet):
+    """TaskSet stored in the tasks table."""
+
+    table = "tasks"
+
+    def get_user_tasks(
+        self,
+        owner_uuid: str,
+        filter_status: Optional[str] = None,
+        inclue_delete: bool = False,
+    ) -> Set:
+        """
+        Returns a set of Task objects related to a User, it can be filtered by
+        deleted and status values.
+        """
+        try:
+            conditions = ["owner_uuid = ?"]
+            parameters: List[Any] = [owner_uuid]
+            if not inclue_delete:
+                conditions.append("deleted = 0")
+            if filter_status is not None:
+                conditions.append("status = ?")
+                parameters.append(filter_status)
+            rows = self.connection.execute(
+                f"{self._select} WHERE {' AND '.join(conditions)}",
+                parameters,
+            )
+            return {self._materialize(row) for row in rows}
+        except Exception as e:
+            raise TaskSetError(f"TaskSet: in getUserTasks: {e}")
+
+    def get_last_user_created_task(self) -> Task:
+        """Returns the most recently created Task."""
+        try:
+            row = self.connection.execute(
+                f"{self._select} ORDER BY creation_datetime DESC, "
+                "rowid DESC LIMIT 1"
+            ).fetchone()
+            if row is None:
+                raise TaskSetError("There are no tasks.")
+            return cast(Task, self._materialize(row))
+        except Exception as e:
+            raise TaskSetError(f"TaskSet: in getLastUserCreatedTask: {e}")
+
+
+SQLITE_SETS = {UserSet: SQLiteUserSet, TaskSet: SQLiteTaskSet}
@@ -1,12 +1,20 @@
 import argparse
 import uuid
-from typing import Any
-
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 import data_management
+from config import (
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    ARGON2_PROFILE,
+    ARGON2_TIME_COST,
+    HASH_WORKERS,
+    VERIFICATION_CACHE_SIZE,
+    VERIFICATION_CACHE_TTL,
+)
 from constants import (
+    ARGON2_PROFILES,
     TASK_STATUSES,
     USERNAME_LENGTH,
     PASSWORD_LENGTH,
@@ -20,10 +28,60 @@ from error_management.exceptions import (
     ValidationError,
 )
 from logging_utils import get_logger
+from verification_cache import VerificationCache
 
+if TYPE_CHECKING:
+    from argon2 import PasswordHasher
 
 state = data_management.get_persistent_data()
-hasher = PasswordHasher()
+
+
+def get_argon2_parameters(profile: str) -> Dict[str, int]:
+    """
+    Returns the argon2 costs of the profile with the configured \
+    overrides applied.
+    """
+    if profile not in ARGON2_PROFILES:
+        raise ValidationError(
+            "The argon2 profile is not defined.", profile, "ARGON2_PROFILE"
+        )
+    overrides = {
+        "time_cost": ARGON2_TIME_COST,
+        "memory_cost": ARGON2_MEMORY_COST,
+        "parallelism": ARGON2_PARALLELISM,
+    }
+    return {
+        key: overrides[key] or value
+        for key, value in ARGON2_PROFILES[profile].items()
+    }
+
+
+def create_hasher(profile: str) -> "PasswordHasher":
+    """Returns a PasswordHasher with the costs of the profile."""
+    # argon2 is imported here, the commands that don't hash skip loading it.
+    from argon2 import PasswordHasher
+
+    parameters = get_argon2_parameters(profile)
+    return PasswordHasher(
+        time_cost=parameters["time_cost"],
+        memory_cost=parameters["memory_cost"],
+        parallelism=parameters["parallelism"],
+    )
+
+
+def get_hasher() -> "PasswordHasher":
+    """Returns the hasher of ARGON2_PROFILE, creating it the first time."""
+    global _hasher
+    if _hasher is None:
+        _hasher = create_hasher(ARGON2_PROFILE)
+    return _hasher
+
+
+verification_cache = VerificationCache(
+    VERIFICATION_CACHE_SIZE, VERIFICATION_CACHE_TTL
+)
+_hasher: Optional["PasswordHasher"] = None
+_hash_executor: Optional[ThreadPoolExecutor] = None
 logger = get_logger(__name__)
 
 
@@ -302,6 +360,14 @@ def verify_task_uuid_arg(password: str) -> str:
         raise argparse.ArgumentTypeError("Introduce the task UUID to edit.")
 
 
+def verify_uuid_arg(uuid_text: str) -> str:
+    """Argparse type function for validating the format of a task UUID."""
+    if verify_uuid(uuid_text):
+        return uuid_text
+    else:
+        raise argparse.ArgumentTypeError("Introduce the task UUID to edit.")
+
+
 def is_valid_task_status_arg(password: str) -> str:
     """Argparse type function for validating a task status."""
     if is_valid_task_status(password):
@@ -320,7 +386,7 @@ def is_valid_task_status_arg(password: str) -> str:
 def hash_word(word: str) -> Any:
     """Returns a hashed word."""
     try:
-        return hasher.hash(word)
+        return get_hasher().hash(word)
     except ValueError:
         raise PasswordAuthenticationError("The password shold be a string.")
     except TypeError:
@@ -330,12 +396,87 @@ def hash_word(word: str) -> Any:
 
 
 @validation_exception_manager
-def verify_hashed_word(word: str, stored_hash: str) -> bool:
-    """Returns True if the hashed word is the same as the stored one."""
+def verify_hashed_word(
+    word: str, stored_hash: str, user_uuid: Optional[str] = None
+) -> bool:
+    """
+    Returns True if the hashed word is the same as the stored one. With \
+    the user_uuid, a recent successful verification skips the hashing.
+    """
+    from argon2.exceptions import VerifyMismatchError
+
     try:
-        if hasher.verify(stored_hash, word):
+        if user_uuid is not None and verification_cache.is_verified(
+            user_uuid, word, stored_hash
+        ):
+            return True
+        if get_hasher().verify(stored_hash, word):
+            if user_uuid is not None:
+                verification_cache.add(user_uuid, word, stored_hash)
             return True
         else:
             raise VerifyMismatchError
     except VerifyMismatchError:
         raise PasswordAuthenticationError("The password is incorrect.")
+
+
+def forget_verified_words(user_uuid: str) -> None:
+    """Drops the cached password verifications of the user."""
+    verification_cache.invalidate(user_uuid)
+
+
+def remember_verified_word(
+    user_uuid: str, word: str, stored_hash: str
+) -> None:
+    """Caches the word as verified, for a hash made from it."""
+    verification_cache.add(user_uuid, word, stored_hash)
+
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """Returns the pool that runs argon2, creating it the first time."""
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=HASH_WORKERS, thread_name_prefix="hashing"
+        )
+    return _hash_executor
+
+
+def hash_word_async(word: str) -> "Future[Any]":
+    """
+    Runs hash_word in the hashing pool and returns its future, use \
+    asyncio.wrap_future to await it.
+    """
+    return get_hash_executor().submit(hash_word, word)
+
+
+def verify_hashed_word_async(
+    word: str, stored_hash: str, user_uuid: Optional[str] = None
+) -> "Future[bool]":
+    """
+    Runs verify_hashed_word in the hashing pool and returns its future, \
+    a cached verification is solved without the pool.
+    """
+    if user_uuid is not None and verification_cache.is_verified(
+        user_uuid, word, stored_hash
+    ):
+        future: "Future[bool]" = Future()
+        future.set_result(True)
+        return future
+    return get_hash_executor().submit(
+        verify_hashed_word, word, stored_hash, user_uuid
+    )
+
+
+def word_needs_rehash(stored_hash: str) -> bool:
+    """
+    Returns True if the stored hash was made with other costs than the \
+    configured profile.
+    """
+    from argon2.exceptions import InvalidHashError
+
+    try:
+        return get_hasher().check_needs_rehash(stored_hash)
+    except InvalidHashError as ihe:
+        logger.warning(f"word_needs_rehash: The hash is not valid: {ihe}")
+        return False
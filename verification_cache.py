@@ -0,0 +1,86 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Tuple
+
+
+class VerificationCache:
+    """
+    Bounded cache of successful password verifications of this process.
+    The keys are the user UUID and an HMAC of the password with a random
+    per process key, so the passwords aren't kept. Entries expire after
+    ttl seconds, the least recently used is evicted when it's full and
+    a hit needs the same stored hash that was verified.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        # Expiration time and verified hash by user UUID and password HMAC.
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_entry_key(self, user_uuid: str, word: str) -> Tuple[str, bytes]:
+        # Imported here, the commands without a login don't need them.
+        import hashlib
+        import hmac
+
+        digest = hmac.new(
+            self._key, word.encode("utf-8"), hashlib.sha256
+        ).digest()
+        return user_uuid, digest
+
+    def is_verified(self, user_uuid: str, word: str, stored_hash: str) -> bool:
+        """
+        Returns True if the word was verified against the stored hash of
+        the user within the ttl.
+        """
+        if self.max_size <= 0:
+            return False
+        import hmac
+
+        entry_key = self._get_entry_key(user_uuid, word)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return False
+            expires_at, verified_hash = entry
+            if expires_at <= time.monotonic() or not hmac.compare_digest(
+                verified_hash, stored_hash
+            ):
+                del self._entries[entry_key]
+                return False
+            self._entries.move_to_end(entry_key)
+            return True
+
+    def add(self, user_uuid: str, word: str, stored_hash: str) -> None:
+        """Stores a successful verification of the word."""
+        if self.max_size <= 0:
+            return
+        entry_key = self._get_entry_key(user_uuid, word)
+        with self._lock:
+            self._entries[entry_key] = (
+                time.monotonic() + self.ttl,
+                stored_hash,
+            )
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_uuid: str) -> None:
+        """Drops every verification of the user."""
+        with self._lock:
+            for entry_key in [
+                key for key in self._entries if key[0] == user_uuid
+            ]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        """Drops every verification."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)